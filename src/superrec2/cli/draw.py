@@ -15,6 +15,26 @@ from superrec2.model.reconciliation import (
 from superrec2.utils.tex import tex_compile, TeXError
 
 
+# Standalone document wrapped around the generated code for PDF output
+_DOCUMENT_HEADER = textwrap.dedent(
+    r"""
+    \documentclass[crop, tikz, border=20pt]{standalone}
+    \usepackage{tikz}
+    \usetikzlibrary{arrows.meta}
+    \usetikzlibrary{shapes}
+    \begin{document}
+    \scrollmode
+    """
+).lstrip()
+
+_DOCUMENT_FOOTER = textwrap.dedent(
+    r"""
+    \batchmode
+    \end{document}
+    """
+).lstrip()
+
+
 def generate_tikz(args):
     """Generate TikZ code corresponding to the given reconciliation."""
     data = json.load(args.input)
@@ -51,23 +71,7 @@ type explicitly",
     elif output_type == "pdf":
         try:
             tex_compile(
-                source=textwrap.dedent(
-                    r"""
-                    \documentclass[crop, tikz, border=20pt]{standalone}
-                    \usepackage{tikz}
-                    \usetikzlibrary{arrows.meta}
-                    \usetikzlibrary{shapes}
-                    \begin{document}
-                    \scrollmode
-                    """
-                ).lstrip()
-                + tikz_code
-                + textwrap.dedent(
-                    r"""
-                    \batchmode
-                    \end{document}
-                    """
-                ).lstrip(),
+                source=f"{_DOCUMENT_HEADER}{tikz_code}{_DOCUMENT_FOOTER}",
                 dest=args.output,
             )
         except TeXError as err:
@@ -1,6 +1,6 @@
 """Compute reconciliations with arbitrary event costs."""
 from itertools import product
-from typing import Generator, NamedTuple, Set
+from typing import Generator, Iterable, Mapping, NamedTuple, Sequence, Set
 from ete3 import TreeNode
 from ..utils.trees import LowestCommonAncestor
 from ..utils.dynamic_programming import (
@@ -57,8 +57,21 @@ class MappingInfo(NamedTuple):
 THLTable = Table[MappingInfo, int]
 
 
-def _compute_thl_try_speciation(
+def _compute_thl_min(
+    table: THLTable,
+    root_node: TreeNode,
+    species: Iterable[TreeNode],
+) -> Entry[int, TreeNode]:
+    """Find the optimal mappings of an object node among a set of species."""
+    row = table[root_node]
+    result = table.entry()
+    result.update(*(Candidate(row[other].value(), other) for other in species))
+    return result
+
+
+def _compute_thl_try_speciation(  # pylint:disable=too-many-arguments
     species_lca: LowestCommonAncestor,
+    subtrees: Mapping[TreeNode, Sequence[TreeNode]],
     root_species: TreeNode,
     root_node: TreeNode,
     table: THLTable,
@@ -71,39 +84,21 @@ def _compute_thl_try_speciation(
 
     # Optimal costs obtained by mapping the left or right node below
     # the left or right species
-    min_ltl = table.entry()
-    min_rtl = table.entry()
-    min_ltr = table.entry()
-    min_rtr = table.entry()
-
-    for left_child in left_species.traverse():
-        min_ltl.update(
-            Candidate(
-                table[left_node][left_child].value(),
-                left_child,
-            )
-        )
-        min_rtl.update(
-            Candidate(
-                table[right_node][left_child].value(),
-                left_child,
-            )
-        )
+    min_ltl = _compute_thl_min(table, left_node, subtrees[left_species])
+    min_rtl = _compute_thl_min(table, right_node, subtrees[left_species])
+    min_ltr = _compute_thl_min(table, left_node, subtrees[right_species])
+    min_rtr = _compute_thl_min(table, right_node, subtrees[right_species])
 
-    for right_child in right_species.traverse():
-        min_ltr.update(Candidate(table[left_node][right_child].value(), right_child))
-        min_rtr.update(Candidate(table[right_node][right_child].value(), right_child))
+    # Both children are mapped below root_species, so their distances
+    # to it are differences of levels
+    levels = species_lca.levels
+    root_level = levels[root_species]
 
     def spe_combinator(left, right):
         return Candidate(
             left.value
             + right.value
-            + loss_cost
-            * (
-                species_lca.distance(root_species, left.info)
-                + species_lca.distance(root_species, right.info)
-                - 2
-            ),
+            + loss_cost * (levels[left.info] + levels[right.info] - 2 * root_level - 2),
             MappingInfo(left.info, right.info),
         )
 
@@ -113,8 +108,9 @@ def _compute_thl_try_speciation(
     )
 
 
-def _compute_thl_try_duplication_transfer(
+def _compute_thl_try_duplication_transfer(  # pylint:disable=too-many-arguments
     species_lca: LowestCommonAncestor,
+    subtrees: Mapping[TreeNode, Sequence[TreeNode]],
     root_species: TreeNode,
     root_node: TreeNode,
     table: THLTable,
@@ -126,28 +122,30 @@ def _compute_thl_try_duplication_transfer(
 
     left_node, right_node = root_node.children
 
+    # Species that are neither ancestors nor descendants of root_species,
+    # found by comparing Euler tour intervals inline
+    start = species_lca.traversal_index
+    end = species_lca.traversal_end
+    root_start = start[root_species]
+    root_end = end[root_species]
+    separate = [
+        other
+        for other in subtrees[species_lca.tree]
+        if not root_start <= start[other] <= root_end
+        and not start[other] <= root_start <= end[other]
+    ]
+
     # Optimal costs obtained by mapping the left or right node inside
     # root_species’ subtree or outside of it
-    min_ltc = table.entry()
-    min_lts = table.entry()
-    min_rtc = table.entry()
-    min_rts = table.entry()
-
-    for other_species in species_lca.tree.traverse():
-        if species_lca.is_ancestor_of(root_species, other_species):
-            min_ltc.update(
-                Candidate(table[left_node][other_species].value(), other_species)
-            )
-            min_rtc.update(
-                Candidate(table[right_node][other_species].value(), other_species)
-            )
-        elif not species_lca.is_ancestor_of(other_species, root_species):
-            min_lts.update(
-                Candidate(table[left_node][other_species].value(), other_species)
-            )
-            min_rts.update(
-                Candidate(table[right_node][other_species].value(), other_species)
-            )
+    min_ltc = _compute_thl_min(table, left_node, subtrees[root_species])
+    min_lts = _compute_thl_min(table, left_node, separate)
+    min_rtc = _compute_thl_min(table, right_node, subtrees[root_species])
+    min_rts = _compute_thl_min(table, right_node, separate)
+
+    # Children kept inside root_species’ subtree are its descendants, so
+    # their distances to it are differences of levels
+    levels = species_lca.levels
+    root_level = levels[root_species]
 
     # Try mapping as a duplication
     def dup_combinator(left, right):
@@ -155,11 +153,7 @@ def _compute_thl_try_duplication_transfer(
             dup_cost
             + left.value
             + right.value
-            + loss_cost
-            * (
-                species_lca.distance(root_species, left.info)
-                + species_lca.distance(root_species, right.info)
-            ),
+            + loss_cost * (levels[left.info] + levels[right.info] - 2 * root_level),
             MappingInfo(left.info, right.info),
         )
 
@@ -169,7 +163,7 @@ def _compute_thl_try_duplication_transfer(
             hgt_cost
             + left.value
             + right.value
-            + loss_cost * species_lca.distance(root_species, left.info),
+            + loss_cost * (levels[left.info] - root_level),
             MappingInfo(left.info, right.info),
         )
 
@@ -178,7 +172,7 @@ def _compute_thl_try_duplication_transfer(
             hgt_cost
             + left.value
             + right.value
-            + loss_cost * species_lca.distance(root_species, right.info),
+            + loss_cost * (levels[right.info] - root_level),
             MappingInfo(left.info, right.info),
         )
 
@@ -199,15 +193,23 @@ def _compute_thl_table(
         retention_policy,
     )
 
+    # Species subtrees are scanned once for each object node, so their
+    # nodes are listed beforehand. The scan order is kept as is since it
+    # decides which of several equal candidates is retained
+    species_lca = rec_input.species_lca
+    species_postorder = tuple(species_lca.tree.traverse("postorder"))
+    subtrees = {node: tuple(node.traverse()) for node in species_postorder}
+
     for root_node in rec_input.object_tree.traverse("postorder"):
         if root_node.is_leaf():
             root_species = rec_input.leaf_object_species[root_node]
             table[root_node][root_species] = Candidate(0)
         else:
-            for root_species in rec_input.species_lca.tree.traverse("postorder"):
-                if not root_species.is_leaf():
+            for root_species in species_postorder:
+                if root_species.children:
                     _compute_thl_try_speciation(
-                        rec_input.species_lca,
+                        species_lca,
+                        subtrees,
                         root_species,
                         root_node,
                         table,
@@ -215,7 +217,8 @@ def _compute_thl_table(
                     )
 
                 _compute_thl_try_duplication_transfer(
-                    rec_input.species_lca,
+                    species_lca,
+                    subtrees,
                     root_species,
                     root_node,
                     table,
@@ -3,17 +3,30 @@ from dataclasses import dataclass, field
 from enum import Enum, auto
 from itertools import chain, product
 from textwrap import indent
-from typing import Generator, Mapping, Type, TypeVar, Union
+from typing import (
+    Callable,
+    Dict,
+    Generator,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 from ete3 import Tree, TreeNode
 from infinity import inf, Infinity
 from .tree_mapping import (
     TreeMapping,
+    freeze_tree_mapping,
     get_species_mapping,
     parse_tree_mapping,
     serialize_tree_mapping,
 )
 from .synteny import (
+    GeneFamily,
     SyntenyMapping,
+    freeze_synteny_mapping,
     parse_synteny_mapping,
     serialize_synteny_mapping,
 )
@@ -73,6 +86,27 @@ def get_default_cost() -> CostValues:
     }
 
 
+T = TypeVar("T")
+
+
+def _cached(obj, name: str, compute: Callable[[], T]) -> T:
+    """
+    Get a value derived from a frozen problem or result, computing it on
+    first access and storing it on the object for later accesses.
+
+    :param obj: frozen object to read from
+    :param name: name of the attribute that stores the value
+    :param compute: function that computes the value
+    :returns: stored or computed value
+    """
+    try:
+        return obj.__dict__[name]
+    except KeyError:
+        result = compute()
+        object.__setattr__(obj, name, result)
+        return result
+
+
 Self = TypeVar("Self", bound="ReconciliationInput")
 
 
@@ -204,31 +238,31 @@ class ReconciliationInput:
 
                 node_object.name = f"O{next_object}"
 
-        for node_species in self.species_lca.tree.traverse("preorder"):
+        for node_species in self.species_lca.preorder:
             if not node_species.name or node_species.name == "NoName":
                 while f"S{next_species}" in self.species_lca.tree:
                     next_species += 1
 
                 node_species.name = f"S{next_species}"
 
-    def __hash__(self):
-        return hash(
-            (
-                self.object_tree,
-                self.species_lca,
-                tuple(
-                    sorted(serialize_tree_mapping(self.leaf_object_species).items()),
-                ),
-                tuple(
-                    (event, self.costs.get(event))
-                    for event in chain(
-                        NodeEvent.__members__.keys(),
-                        EdgeEvent.__members__.keys(),
-                    )
-                ),
-            )
+    def _hash_fields(self) -> tuple:
+        """Get the values that identify this problem for hashing."""
+        return (
+            self.object_tree,
+            self.species_lca,
+            freeze_tree_mapping(self.leaf_object_species),
+            tuple(
+                (event, self.costs.get(event))
+                for event in chain(
+                    NodeEvent.__members__.keys(),
+                    EdgeEvent.__members__.keys(),
+                )
+            ),
         )
 
+    def __hash__(self):
+        return hash(self._hash_fields())
+
 
 @dataclass(frozen=True)
 class ReconciliationOutput:
@@ -270,112 +304,175 @@ class ReconciliationOutput:
         """Reconstruct an output from its plain dictionary representation."""
         return cls(**cls._from_dict(data))
 
-    def node_event(self, node: TreeNode) -> NodeEvent:
+    def node_event(self, node: TreeNode) -> NodeEvent:  # pylint:disable=too-many-locals
         """
         Find the event associated to a node.
 
+        Ancestry between species is tested by comparing their Euler tour
+        intervals directly, which saves a method call per test.
+
         :param node: node to query
         :returns: event associated to the node
         """
         species_lca = self.input.species_lca
         rec = self.object_species
+        node_species = rec[node]
+        children = node.children
 
-        if node.is_leaf():
+        if not children:
             return (
                 NodeEvent.LEAF
-                if rec[node] == self.input.leaf_object_species[node]
+                if node_species == self.input.leaf_object_species[node]
                 else NodeEvent.INVALID
             )
 
-        left_node, right_node = node.children
-
-        if species_lca.is_strict_ancestor_of(
-            rec[left_node], rec[node]
-        ) or species_lca.is_strict_ancestor_of(rec[right_node], rec[node]):
+        start = species_lca.traversal_index
+        end = species_lca.traversal_end
+        left_species = rec[children[0]]
+        right_species = rec[children[1]]
+        node_start = start[node_species]
+        left_start = start[left_species]
+        left_end = end[left_species]
+        right_start = start[right_species]
+        right_end = end[right_species]
+
+        if (left_species != node_species and left_start <= node_start <= left_end) or (
+            right_species != node_species and right_start <= node_start <= right_end
+        ):
             return NodeEvent.INVALID
 
-        if species_lca.is_ancestor_of(
-            rec[node], rec[left_node]
-        ) and species_lca.is_ancestor_of(rec[node], rec[right_node]):
+        node_end = end[node_species]
+        above_left = node_start <= left_start <= node_end
+        above_right = node_start <= right_start <= node_end
+
+        if above_left and above_right:
             return (
                 NodeEvent.SPECIATION
                 if (
-                    rec[node] == species_lca(rec[left_node], rec[right_node])
-                    and not species_lca.is_comparable(
-                        rec[left_node],
-                        rec[right_node],
-                    )
+                    not left_start <= right_start <= left_end
+                    and not right_start <= left_start <= right_end
+                    and node_species == species_lca(left_species, right_species)
                 )
                 else NodeEvent.DUPLICATION
             )
 
-        if species_lca.is_ancestor_of(
-            rec[node], rec[left_node]
-        ) or species_lca.is_ancestor_of(rec[node], rec[right_node]):
+        if above_left or above_right:
             return NodeEvent.HORIZONTAL_TRANSFER
 
         return NodeEvent.INVALID
 
-    def _cost_rec(self, node: TreeNode = None) -> Union[int, Infinity]:
-        event = self.node_event(node)
-        species_lca = self.input.species_lca
-        costs = self.input.costs
+    def node_events(self) -> Dict[TreeNode, NodeEvent]:
+        """
+        Find the events associated to all the nodes of the object tree.
+
+        :returns: event associated to each node
+        """
+        return {
+            node: self.node_event(node) for node in self.input.object_tree.traverse()
+        }
+
+    def _count_events(  # pylint:disable=too-many-locals
+        self, events: Mapping[TreeNode, NodeEvent]
+    ) -> Optional[Tuple[Tuple[Event, int], ...]]:
+        """
+        Count the priced events of this reconciliation.
+
+        :param events: event associated to each node
+        :returns: number of occurrences of each event that has a cost,
+            or None if the reconciliation is invalid
+        """
+        distance = self.input.species_lca.distance
+        is_ancestor_of = self.input.species_lca.is_ancestor_of
         rec = self.object_species
 
-        if event == NodeEvent.INVALID:
-            return inf
+        # Count the events and losses in a single pass over the object tree,
+        # keeping the loop on plain integers
+        speciations = duplications = transfers = losses = 0
 
-        if event == NodeEvent.LEAF:
-            return 0
+        for node in self.input.object_tree.traverse():
+            event = events[node]
 
-        left_node, right_node = node.children
-        left_cost = self._cost_rec(left_node)
-        left_dist = species_lca.distance(rec[node], rec[left_node])
-        right_cost = self._cost_rec(right_node)
-        right_dist = species_lca.distance(rec[node], rec[right_node])
+            if event is NodeEvent.INVALID:
+                return None
 
-        if event == NodeEvent.SPECIATION:
-            return (
-                costs[NodeEvent.SPECIATION]
-                + left_cost
-                + right_cost
-                + costs[EdgeEvent.FULL_LOSS] * (left_dist + right_dist - 2)
-            )
+            if event is NodeEvent.LEAF:
+                continue
 
-        if event == NodeEvent.DUPLICATION:
-            return (
-                costs[NodeEvent.DUPLICATION]
-                + left_cost
-                + right_cost
-                + costs[EdgeEvent.FULL_LOSS] * (left_dist + right_dist)
-            )
+            node_species = rec[node]
+            left_species = rec[node.children[0]]
+            right_species = rec[node.children[1]]
 
-        assert event == NodeEvent.HORIZONTAL_TRANSFER
+            if event is NodeEvent.SPECIATION:
+                speciations += 1
+                losses += (
+                    distance(node_species, left_species)
+                    + distance(node_species, right_species)
+                    - 2
+                )
+            elif event is NodeEvent.DUPLICATION:
+                duplications += 1
+                losses += distance(node_species, left_species) + distance(
+                    node_species, right_species
+                )
+            else:
+                assert event is NodeEvent.HORIZONTAL_TRANSFER
+                transfers += 1
+                losses += distance(
+                    node_species,
+                    left_species
+                    if is_ancestor_of(node_species, left_species)
+                    else right_species,
+                )
 
-        dist_conserved = (
-            left_dist
-            if species_lca.is_ancestor_of(rec[node], rec[left_node])
-            else right_dist
-        )
         return (
-            costs[NodeEvent.HORIZONTAL_TRANSFER]
-            + left_cost
-            + right_cost
-            + costs[EdgeEvent.FULL_LOSS] * dist_conserved
+            (NodeEvent.SPECIATION, speciations),
+            (NodeEvent.DUPLICATION, duplications),
+            (NodeEvent.HORIZONTAL_TRANSFER, transfers),
+            (EdgeEvent.FULL_LOSS, losses),
+        )
+
+    def _events(self) -> Mapping[TreeNode, NodeEvent]:
+        """Get the events associated to all nodes, found only once."""
+        return _cached(self, "_events_cache", self.node_events)
+
+    def _cost(self) -> Union[int, Infinity]:
+        # Events only depend on the mapping, so they are only counted once,
+        # while the costs they are weighed by are read anew on each call
+        counts = _cached(
+            self, "_event_counts", lambda: self._count_events(self._events())
         )
 
+        if counts is None:
+            return inf
+
+        costs = self.input.costs
+        total = 0
+
+        for event, count in counts:
+            if count:
+                value = costs[event]
+
+                if value == inf:
+                    return inf
+
+                total += value * count
+
+        return total
+
     def cost(self) -> Union[int, Infinity]:
         """Compute the total cost of this reconciliation."""
-        return self._cost_rec(self.input.object_tree)
+        return self._cost()
 
-    def __hash__(self):
-        return hash(
-            (
-                self.input,
-                tuple(sorted(serialize_tree_mapping(self.object_species).items())),
-            )
+    def _hash_fields(self) -> tuple:
+        """Get the values that identify this result for hashing."""
+        return (
+            self.input,
+            freeze_tree_mapping(self.object_species),
         )
 
+    def __hash__(self):
+        return hash(self._hash_fields())
+
 
 @dataclass(frozen=True, repr=False)
 class SuperReconciliationInput(ReconciliationInput):
@@ -401,23 +498,15 @@ class SuperReconciliationInput(ReconciliationInput):
             ),
         }
 
-    def __hash__(self):
-        return hash(
-            (
-                super().__hash__(),
-                tuple(
-                    sorted(
-                        (
-                            (node, tuple(synteny))
-                            for node, synteny in serialize_synteny_mapping(
-                                self.leaf_syntenies
-                            ).items()
-                        )
-                    )
-                ),
-            )
+    def _hash_fields(self) -> tuple:
+        return (
+            *super()._hash_fields(),
+            freeze_synteny_mapping(self.leaf_syntenies),
         )
 
+    def __hash__(self):
+        return hash(self._hash_fields())
+
 
 @dataclass(frozen=True, repr=False)
 class SuperReconciliationOutput(ReconciliationOutput):
@@ -456,7 +545,9 @@ class SuperReconciliationOutput(ReconciliationOutput):
         """Compute the cost of the reconciliation part."""
         return super().cost()
 
-    def _ordered_labeling_cost(self):
+    def _ordered_labeling_cost(  # pylint:disable=too-many-locals
+        self, events: Mapping[TreeNode, NodeEvent]
+    ):
         """Compute the ordered segmental loss cost of the labeling."""
         tree = self.input.object_tree
         rec = self.object_species
@@ -468,10 +559,12 @@ class SuperReconciliationOutput(ReconciliationOutput):
         sloss_cost = self.input.costs[EdgeEvent.SEGMENTAL_LOSS]
 
         for node in tree.traverse("preorder"):
-            if not node.is_leaf():
-                event = self.node_event(node)
+            children = node.children
+
+            if children:
+                event = events[node]
                 sub_mask = masks[node]
-                left_node, right_node = node.children
+                left_node, right_node = children
 
                 left_mask = masks[left_node] = mask_from_subseq(
                     self.syntenies[left_node], root_syn
@@ -508,7 +601,9 @@ class SuperReconciliationOutput(ReconciliationOutput):
 
         return total_cost
 
-    def _unordered_labeling_cost(self):
+    def _unordered_labeling_cost(  # pylint:disable=too-many-locals
+        self, events: Mapping[TreeNode, NodeEvent]
+    ):
         """Compute the unordered segmental loss cost of the labeling."""
         tree = self.input.object_tree
         rec = self.object_species
@@ -516,18 +611,29 @@ class SuperReconciliationOutput(ReconciliationOutput):
         total_cost = 0
         sloss_cost = self.input.costs[EdgeEvent.SEGMENTAL_LOSS]
 
+        # Represent each synteny as a bitmask of the families it contains,
+        # so that inclusion tests do not need to build sets
+        family_bits: Dict[GeneFamily, int] = {}
+        masks = {}
+
+        for node, synteny in self.syntenies.items():
+            mask = 0
+
+            for family in synteny:
+                mask |= family_bits.setdefault(family, 1 << len(family_bits))
+
+            masks[node] = mask
+
         for node in tree.traverse("preorder"):
-            if not node.is_leaf():
-                event = self.node_event(node)
-                left_node, right_node = node.children
+            children = node.children
 
-                node_set = set(self.syntenies[node])
-                left_cost = (
-                    0 if node_set <= set(self.syntenies[left_node]) else sloss_cost
-                )
-                right_cost = (
-                    0 if node_set <= set(self.syntenies[right_node]) else sloss_cost
-                )
+            if children:
+                event = events[node]
+                left_node, right_node = children
+
+                node_mask = masks[node]
+                left_cost = 0 if not node_mask & ~masks[left_node] else sloss_cost
+                right_cost = 0 if not node_mask & ~masks[right_node] else sloss_cost
 
                 if event == NodeEvent.SPECIATION:
                     total_cost += left_cost + right_cost
@@ -542,31 +648,28 @@ class SuperReconciliationOutput(ReconciliationOutput):
 
         return total_cost
 
-    def labeling_cost(self):
-        """Compute the segmental loss cost of the labeling."""
+    def _labeling_cost(self, events: Mapping[TreeNode, NodeEvent]):
         if self.ordered:
-            return self._ordered_labeling_cost()
+            return self._ordered_labeling_cost(events)
 
-        return self._unordered_labeling_cost()
+        return self._unordered_labeling_cost(events)
+
+    def labeling_cost(self):
+        """Compute the segmental loss cost of the labeling."""
+        return self._labeling_cost(self._events())
 
     def cost(self):
         """Compute the cost of this super-reconciliation."""
-        return self.reconciliation_cost() + self.labeling_cost()
+        # Both parts of the cost depend on the events, which are only
+        # found once and shared between them
+        return self._cost() + self._labeling_cost(self._events())
 
-    def __hash__(self):
-        return hash(
-            (
-                super().__hash__(),
-                tuple(
-                    sorted(
-                        (
-                            (node, tuple(synteny))
-                            for node, synteny in serialize_synteny_mapping(
-                                self.syntenies
-                            ).items()
-                        )
-                    )
-                ),
-                self.ordered,
-            )
+    def _hash_fields(self) -> tuple:
+        return (
+            *super()._hash_fields(),
+            freeze_synteny_mapping(self.syntenies),
+            self.ordered,
         )
+
+    def __hash__(self):
+        return hash(self._hash_fields())
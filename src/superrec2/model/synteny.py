@@ -1,8 +1,21 @@
 """Representation, parsing, and handling of syntenies."""
 import re
-from typing import Dict, Iterable, Mapping, Optional, Sequence, Set
+from functools import lru_cache
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 from ete3 import Tree, TreeNode
+from ete3.coretype.tree import TreeError
 from ..utils.text import balanced_wrap
+from ..utils.trees import nodes_by_name
 
 
 GeneFamily = str
@@ -18,6 +31,22 @@ UnorderedSyntenyMapping = Mapping[TreeNode, UnorderedSynteny]
 DIGITS = re.compile(r"([0-9]+)")
 
 
+@lru_cache(maxsize=4096)
+def _synteny_key(obj: GeneFamily) -> Tuple[Union[int, str], ...]:
+    """
+    Get the sort key of a gene family, in which digit groups are
+    compared as numbers.
+
+    Keys are cached since the same families appear in many syntenies.
+    """
+    # Splitting on a capturing group alternates between the text around
+    # digit groups and the digit groups themselves, so that digit groups
+    # are exactly the parts at odd indices
+    parts: List[Union[int, str]] = DIGITS.split(obj)
+    parts[1::2] = map(int, parts[1::2])
+    return tuple(parts)
+
+
 def sort_synteny(synteny: Synteny) -> OrderedSynteny:
     """
     Sort objects of a synteny in a canonical order.
@@ -25,12 +54,7 @@ def sort_synteny(synteny: Synteny) -> OrderedSynteny:
     :param synteny: original synteny, with or without a defined order
     :returns: synteny in canonical order
     """
-
-    def key(obj: str):
-        parts = DIGITS.split(obj)
-        return [int(part) if part.isdigit() else part for part in parts]
-
-    return sorted(synteny, key=key)
+    return sorted(synteny, key=_synteny_key)
 
 
 def format_synteny(synteny: Synteny, width: Optional[int] = None) -> str:
@@ -59,7 +83,12 @@ def parse_synteny_mapping(tree: Tree, data: Dict[str, Synteny]) -> SyntenyMappin
     :param data: plain mapping to map from
     :returns: parsed mapping
     """
-    return {tree & node: synteny for node, synteny in data.items()}
+    nodes = nodes_by_name(tree)
+
+    try:
+        return {nodes[node]: synteny for node, synteny in data.items()}
+    except KeyError as error:
+        raise TreeError("Node not found") from error
 
 
 def serialize_synteny_mapping(
@@ -77,3 +106,33 @@ def serialize_synteny_mapping(
         )
         for node, synteny in mapping.items()
     }
+
+
+def freeze_synteny_mapping(
+    mapping: SyntenyMapping,
+) -> Tuple[Tuple[str, Tuple[GeneFamily, ...]], ...]:
+    """
+    Convert a mapping of tree nodes to syntenies to a canonical hashable form.
+
+    This is equivalent to sorting the items of the serialized mapping and
+    turning each synteny into a tuple, without building the intermediate
+    dictionary and lists.
+
+    :param mapping: mapping to convert
+    :returns: sorted pairs of node names and syntenies
+    """
+    return tuple(
+        sorted(
+            [
+                (
+                    node.name,
+                    tuple(
+                        sorted(synteny, key=_synteny_key)
+                        if isinstance(synteny, set)
+                        else synteny
+                    ),
+                )
+                for node, synteny in mapping.items()
+            ]
+        )
+    )
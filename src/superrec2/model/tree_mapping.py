@@ -1,6 +1,9 @@
 """Representation and parsing of mappings between tree nodes."""
-from typing import Dict, Mapping
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional, Tuple
 from ete3 import Tree, TreeNode
+from ete3.coretype.tree import TreeError
+from ..utils.trees import nodes_by_name
 
 
 TreeMapping = Mapping[TreeNode, TreeNode]
@@ -15,11 +18,30 @@ def parse_tree_mapping(
     :param from_tree: first tree
     :param to_tree: second tree
     :param data: plain mapping to convert from
+    :raises TreeError: if a name does not match any node of its tree
     :returns: parsed mapping
     """
-    return {
-        from_tree & from_node: to_tree & to_node for from_node, to_node in data.items()
-    }
+    from_nodes = nodes_by_name(from_tree)
+    to_nodes = nodes_by_name(to_tree)
+
+    try:
+        return {
+            from_nodes[from_node]: to_nodes[to_node]
+            for from_node, to_node in data.items()
+        }
+    except KeyError as error:
+        raise TreeError("Node not found") from error
+
+
+@dataclass(slots=True)
+class _SpeciesTrie:
+    """Entry of a trie of the underscore-separated parts of species names."""
+
+    # Species whose name ends at this entry, if any
+    species: Optional[TreeNode] = None
+
+    # Entries for the parts that can follow this one
+    children: Dict[str, "_SpeciesTrie"] = field(default_factory=dict)
 
 
 def get_species_mapping(tree: Tree, species_tree: Tree) -> TreeMapping:
@@ -38,20 +60,31 @@ def get_species_mapping(tree: Tree, species_tree: Tree) -> TreeMapping:
     :returns: extracted mapping
     """
     result = {}
-    species_ignorecase = {}
+
+    species_trie = _SpeciesTrie()
 
     for node in species_tree:
         if node.name:
-            species_ignorecase[node.name.lower()] = node
+            entry = species_trie
+
+            for part in node.name.lower().split("_"):
+                entry = entry.children.setdefault(part, _SpeciesTrie())
+
+            entry.species = node
 
     for node in tree:
-        parts = node.name.split("_")
+        # Walk down the trie along the parts of the name that are followed
+        # by an underscore, stopping at the first species that matches
+        entry = species_trie
 
-        for i in range(1, len(parts)):
-            prefix = "_".join(parts[:i]).lower()
+        for part in node.name.lower().split("_")[:-1]:
+            entry = entry.children.get(part)
 
-            if prefix in species_ignorecase:
-                result[node] = species_ignorecase[prefix]
+            if entry is None:
+                break
+
+            if entry.species is not None:
+                result[node] = entry.species
                 break
 
     return result
@@ -65,3 +98,20 @@ def serialize_tree_mapping(mapping: TreeMapping) -> Dict[str, str]:
     :returns: representation that can be used to serialize the mapping
     """
     return {from_node.name: to_node.name for from_node, to_node in mapping.items()}
+
+
+def freeze_tree_mapping(mapping: TreeMapping) -> Tuple[Tuple[str, str], ...]:
+    """
+    Convert a mapping between two trees to a canonical hashable form.
+
+    This gives the sorted items of the serialized mapping, but sorts the
+    pairs of names in a single pass without building a dictionary first.
+
+    :param mapping: mapping to convert
+    :returns: sorted pairs of node names
+    """
+    return tuple(
+        sorted(
+            [(from_node.name, to_node.name) for from_node, to_node in mapping.items()]
+        )
+    )
@@ -1,6 +1,7 @@
 """Compute layouts for reconciliations."""
-from typing import Any, Dict
-from ete3 import Tree, TreeNode
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+from ete3 import TreeNode
 from .tikz import measure_nodes
 from .model import (
     Branch,
@@ -12,6 +13,7 @@ from .model import (
     PseudoGene,
 )
 from ..model.reconciliation import (
+    Event,
     NodeEvent,
     EdgeEvent,
     ReconciliationOutput,
@@ -22,8 +24,151 @@ from ..utils import tex
 from ..utils.geometry import Position, Rect, Size
 
 
+@dataclass(slots=True)
+class _MutableRect:
+    """Mutable counterpart of :class:`Rect` used while computing a layout."""
+
+    x: float = 0
+    y: float = 0
+    w: float = 0
+    h: float = 0
+
+    def shift(self, pos: tuple) -> None:
+        """Shift the rectangle in place by adding the given vector."""
+        self.x += pos[0]
+        self.y += pos[1]
+
+    def top(self) -> Position:
+        """Position of the upper edge’s center."""
+        return Position(self.x + self.w / 2, self.y)
+
+    def right(self) -> Position:
+        """Position of the right edge’s center."""
+        return Position(self.x + self.w, self.y + self.h / 2)
+
+    def bottom(self) -> Position:
+        """Position of the lower edge’s center."""
+        return Position(self.x + self.w / 2, self.y + self.h)
+
+    def left(self) -> Position:
+        """Position of the left edge’s center."""
+        return Position(self.x, self.y + self.h / 2)
+
+    def center(self) -> Position:
+        """Position of the center."""
+        return Position(self.x + self.w / 2, self.y + self.h / 2)
+
+    def to_rect(self) -> Rect:
+        """Get an immutable copy of this rectangle."""
+        return Rect(self.x, self.y, self.w, self.h)
+
+
+@dataclass(slots=True)
+class _BranchState:  # pylint:disable=too-many-instance-attributes
+    """Mutable counterpart of :class:`Branch` used while computing a layout."""
+
+    kind: Event
+    name: str
+    left: Optional[GeneAnchor] = None
+    right: Optional[GeneAnchor] = None
+    color: Optional[str] = None
+    rect: _MutableRect = field(default_factory=_MutableRect)
+
+    # Species that receives the transferred gene (for transfers)
+    foreign_species: Optional[TreeNode] = None
+
+    # Whether the branch links to the parent species, as opposed to being
+    # the child of another branch in the same species
+    is_anchor: bool = True
+
+
+# Defaults for subtrees that are not laid out yet
+_EMPTY_RECT = Rect(0, 0, 0, 0)
+_EMPTY_SIZE = Size(0, 0)
+_ORIGIN = Position(0, 0)
+
+
+@dataclass(slots=True)
+class _SubtreeState:  # pylint:disable=too-many-instance-attributes
+    """Mutable counterpart of :class:`SubtreeLayout` used while computing a layout."""
+
+    branches: Dict[GeneAnchor, _BranchState] = field(default_factory=dict)
+    anchors: Dict[GeneAnchor, Position] = field(default_factory=dict)
+    rect: Rect = _EMPTY_RECT
+    trunk: Rect = _EMPTY_RECT
+    fork_thickness: float = 0
+
+    # Overall size of the subtree and positions of its child subtrees
+    # relative to it, before it is placed
+    size: Size = _EMPTY_SIZE
+    left_pos: Position = _ORIGIN
+    right_pos: Position = _ORIGIN
+
+    # States of the left and right child subtrees, if any
+    children: Tuple["_SubtreeState", ...] = ()
+
+
+class _Axis(NamedTuple):
+    """
+    Roles of the two coordinates in a given layout orientation.
+
+    Branches are stacked *across* the trunk of their species and follow
+    each other *in sequence* along the trunk. Code written in terms of
+    these two roles works in both orientations.
+    """
+
+    # Index of the coordinate that runs across the trunks
+    across: int
+
+    # Index of the coordinate that runs along the trunks
+    sequence: int
+
+    def point(self, across: float, sequence: float) -> Position:
+        """Make a position from its across and sequence coordinates."""
+        if self.across == 0:
+            return Position(across, sequence)
+
+        return Position(sequence, across)
+
+    def size(self, across: float, sequence: float) -> Size:
+        """Make a size from its across and sequence dimensions."""
+        if self.across == 0:
+            return Size(across, sequence)
+
+        return Size(sequence, across)
+
+
+_AXES = {
+    Orientation.VERTICAL: _Axis(across=0, sequence=1),
+    Orientation.HORIZONTAL: _Axis(across=1, sequence=0),
+}
+
+
+LayoutState = Dict[TreeNode, _SubtreeState]
+
+
+# Measurements of branch nodes, reusable across layout computations
+MeasureCache = Dict[Tuple[DrawParams, Event, str], tex.MeasureBox]
+
+
+# Branch kinds, bound once and compared by identity in the loops below,
+# since looking members up on their enum classes is comparatively slow
+_LEAF = NodeEvent.LEAF
+_SPECIATION = NodeEvent.SPECIATION
+_DUPLICATION = NodeEvent.DUPLICATION
+_TRANSFER = NodeEvent.HORIZONTAL_TRANSFER
+_FULL_LOSS = EdgeEvent.FULL_LOSS
+
+# Kinds of branches that are stacked next to each other across the trunk
+_STACKED_ACROSS = (_LEAF, _SPECIATION, _FULL_LOSS)
+
+# Kinds of branches that are stacked one after the other along the trunk
+_STACKED_SEQUENCE = (_SPECIATION, _FULL_LOSS)
+
+
 def _add_losses(
-    layout_state: Dict[TreeNode, Dict],
+    layout_state: LayoutState,
+    species_up: Mapping[TreeNode, Tuple[Optional[TreeNode], int]],
     gene: TreeNode,
     start_species: TreeNode,
     end_species: TreeNode,
@@ -32,6 +177,8 @@ def _add_losses(
     Insert virtual gene loss nodes between
     a parent species and a child species.
 
+    :param species_up: parent of each species and index of the species
+        among its siblings
     :param gene: parent gene that is lost
     :param start_species: lower species in which the gene is conserved
     :param end_species: parent of the species from which the
@@ -40,43 +187,38 @@ def _add_losses(
     """
     prev_gene = gene
     color = getattr(gene, "color", None)
-    prev_species = start_species
-    start_species = start_species.up
+    start_species, side = species_up[start_species]
 
     while start_species != end_species:
-        is_left = prev_species == start_species.children[0]
-        is_right = prev_species == start_species.children[1]
         state = layout_state[start_species]
         cur_gene = PseudoGene()
 
-        state["anchor_nodes"].add(cur_gene)
-        state["branches"][cur_gene] = {
-            "kind": EdgeEvent.FULL_LOSS,
-            "name": "",
-            "left": prev_gene if is_left else None,
-            "right": prev_gene if is_right else None,
-        }
-
-        if color is not None:
-            state["branches"][cur_gene]["color"] = color
+        state.branches[cur_gene] = _BranchState(
+            kind=EdgeEvent.FULL_LOSS,
+            name="",
+            left=prev_gene if side == 0 else None,
+            right=prev_gene if side == 1 else None,
+            color=color,
+        )
 
         prev_gene = cur_gene
-        prev_species = start_species
-        start_species = start_species.up
+        start_species, side = species_up[start_species]
 
     return prev_gene
 
 
 def _compute_branches(  # pylint:disable=too-many-locals
-    layout_state: Dict[TreeNode, Dict],
+    layout_state: LayoutState,
     rec: ReconciliationOutput,
+    species_postorder: Sequence[TreeNode],
     params: DrawParams,
 ) -> None:
     """Create the branching nodes for each species."""
     gene_tree = rec.input.object_tree
     species_lca = rec.input.species_lca
-    species_tree = species_lca.tree
-    mapping = rec.object_species
+    # Snapshot the gene-to-species mapping into a plain dictionary, which
+    # is shared by the bucketing below and by every event lookup
+    mapping = dict(rec.object_species)
     syntenies = rec.syntenies if isinstance(rec, SuperReconciliationOutput) else {}
 
     # Propagate color feature downwards in the tree
@@ -94,18 +236,43 @@ def _compute_branches(  # pylint:disable=too-many-locals
                 last_color = None
                 last_color_node = None
 
-    # Find gene tree nodes associated to each species and create branches
-    for root_species in species_tree.traverse("postorder"):
-        state: Dict[str, Any] = {
-            "branches": {},
-            "anchor_nodes": set(),
-        }
-        layout_state[root_species] = state
+    # Parent of each species and position among its siblings, used to
+    # route losses without going through ete3 node properties
+    species_up: Dict[TreeNode, Tuple[Optional[TreeNode], int]] = {
+        child: (root_species, index)
+        for root_species in species_postorder
+        for index, child in enumerate(root_species.children)
+    }
+    species_up[species_postorder[-1]] = (None, 0)
+
+    # Find gene tree nodes associated to each species
+    species_genes: Dict[TreeNode, List[TreeNode]] = {
+        root_species: [] for root_species in species_postorder
+    }
+
+    # Leaf genes are recorded while bucketing, so that the main loop
+    # does not have to query ete3 for each gene’s children
+    gene_leaves = set()
+
+    for root_gene in gene_tree.traverse("postorder"):
+        species_genes[mapping[root_gene]].append(root_gene)
+
+        if not root_gene.children:
+            gene_leaves.add(root_gene)
+
+    # Bind methods used for every gene outside of the loop
+    node_event = rec.node_event
+    is_ancestor_of = species_lca.is_ancestor_of
+
+    # Create branches for each species
+    layout_state.update(
+        (root_species, _SubtreeState()) for root_species in species_postorder
+    )
 
-        for root_gene in gene_tree.traverse("postorder"):
-            if mapping[root_gene] != root_species:
-                continue
+    for root_species in species_postorder:
+        state = layout_state[root_species]
 
+        for root_gene in species_genes[root_species]:
             synteny = (
                 format_synteny(
                     map(tex.escape, syntenies[root_gene]),
@@ -115,8 +282,9 @@ def _compute_branches(  # pylint:disable=too-many-locals
                 else ""
             )
             equal_to_parent = syntenies.get(root_gene) == syntenies.get(root_gene.up)
+            color = getattr(root_gene, "color", None)
 
-            if root_gene.is_leaf():
+            if root_gene in gene_leaves:
                 # Create branches even for leaf genes
                 if synteny:
                     name = synteny
@@ -129,480 +297,548 @@ def _compute_branches(  # pylint:disable=too-many-locals
                 else:
                     name = ""
 
-                state["anchor_nodes"].add(root_gene)
-                state["branches"][root_gene] = {
-                    "kind": NodeEvent.LEAF,
-                    "name": name,
-                }
+                state.branches[root_gene] = _BranchState(
+                    kind=NodeEvent.LEAF,
+                    name=name,
+                    color=color,
+                )
             else:
                 # Create branches for actual internal nodes
                 left_gene, right_gene = root_gene.children
-                event = rec.node_event(root_gene)
+                event = node_event(root_gene)
                 name = synteny if not equal_to_parent else ""
 
-                if event == NodeEvent.SPECIATION:
+                if event is _SPECIATION:
                     # Speciation nodes are located below the trunk
                     # and linked to child species’s gene anchors
                     left_species = root_species.children[0]
 
-                    if species_lca.is_ancestor_of(left_species, mapping[right_gene]):
+                    if is_ancestor_of(left_species, mapping[right_gene]):
                         # Left gene and right gene are swapped relative
                         # to the left and right species
                         left_gene, right_gene = right_gene, left_gene
 
                     left_gene = _add_losses(
                         layout_state,
+                        species_up,
                         left_gene,
                         mapping[left_gene],
                         root_species,
                     )
                     right_gene = _add_losses(
                         layout_state,
+                        species_up,
                         right_gene,
                         mapping[right_gene],
                         root_species,
                     )
 
-                    state["anchor_nodes"].add(root_gene)
-                    state["branches"][root_gene] = {
-                        "kind": NodeEvent.SPECIATION,
-                        "name": name,
-                        "left": left_gene,
-                        "right": right_gene,
-                    }
-                elif event == NodeEvent.DUPLICATION:
+                    state.branches[root_gene] = _BranchState(
+                        kind=NodeEvent.SPECIATION,
+                        name=name,
+                        left=left_gene,
+                        right=right_gene,
+                        color=color,
+                    )
+                elif event is _DUPLICATION:
                     # Duplications are located in the trunk and linked
                     # to other nodes in the same species
                     left_gene = _add_losses(
                         layout_state,
+                        species_up,
                         left_gene,
                         mapping[left_gene],
                         root_species.up,
                     )
                     right_gene = _add_losses(
                         layout_state,
+                        species_up,
                         right_gene,
                         mapping[right_gene],
                         root_species.up,
                     )
 
-                    state["anchor_nodes"].add(root_gene)
-                    state["anchor_nodes"].remove(left_gene)
-                    state["anchor_nodes"].remove(right_gene)
-                    state["branches"][root_gene] = {
-                        "kind": NodeEvent.DUPLICATION,
-                        "name": name,
-                        "left": left_gene,
-                        "right": right_gene,
-                    }
-                elif event == NodeEvent.HORIZONTAL_TRANSFER:
+                    state.branches[left_gene].is_anchor = False
+                    state.branches[right_gene].is_anchor = False
+                    state.branches[root_gene] = _BranchState(
+                        kind=NodeEvent.DUPLICATION,
+                        name=name,
+                        left=left_gene,
+                        right=right_gene,
+                        color=color,
+                    )
+                elif event is _TRANSFER:
                     # Transfers are located in the trunk, like duplications,
                     # but are linked to a node outside the current subtree
                     conserv_gene, foreign_gene = (
                         (left_gene, right_gene)
-                        if species_lca.is_ancestor_of(root_species, mapping[left_gene])
+                        if is_ancestor_of(root_species, mapping[left_gene])
                         else (right_gene, left_gene)
                     )
                     conserv_gene = _add_losses(
                         layout_state,
+                        species_up,
                         conserv_gene,
                         mapping[conserv_gene],
                         root_species.up,
                     )
 
-                    state["anchor_nodes"].add(root_gene)
-                    state["anchor_nodes"].remove(conserv_gene)
-                    state["branches"][root_gene] = {
-                        "kind": NodeEvent.HORIZONTAL_TRANSFER,
-                        "name": name,
-                        "left": conserv_gene,
-                        "right": foreign_gene,
-                    }
+                    state.branches[conserv_gene].is_anchor = False
+                    state.branches[root_gene] = _BranchState(
+                        kind=NodeEvent.HORIZONTAL_TRANSFER,
+                        name=name,
+                        left=conserv_gene,
+                        right=foreign_gene,
+                        color=color,
+                        foreign_species=mapping[foreign_gene],
+                    )
                 else:
                     raise ValueError("Invalid event")
 
-            if hasattr(root_gene, "color"):
-                state["branches"][root_gene]["color"] = root_gene.color
+
+def _measure_branches(
+    layout_states: Sequence[LayoutState],
+    params: DrawParams,
+    cache: MeasureCache,
+    jobs: int,
+) -> List[Dict[GeneAnchor, tex.MeasureBox]]:
+    """
+    Measure the branches of a set of layouts in a single TeX run.
+
+    Branches that were already measured with the same parameters, either
+    earlier in this run or in a previous run sharing the same cache, are
+    not measured again.
+
+    :returns: measurements of the branches of each layout, in order
+    """
+    # Layouts can share the same gene nodes (e.g., several reconciliations
+    # of the same input), so keys are kept separately for each layout
+    all_keys: List[Dict[GeneAnchor, Tuple[DrawParams, Event, str]]] = []
+    pending: Dict[Tuple[DrawParams, Event, str], None] = {}
+
+    for layout_state in layout_states:
+        keys: Dict[GeneAnchor, Tuple[DrawParams, Event, str]] = {}
+        all_keys.append(keys)
+
+        for layout in layout_state.values():
+            for node, branch in layout.branches.items():
+                key = keys[node] = (params, branch.kind, branch.name)
+
+                if key not in cache:
+                    pending[key] = None
+
+    if pending:
+        boxes = measure_nodes([(kind, name) for _, kind, name in pending], params, jobs)
+        cache.update(zip(pending, boxes))
+
+    return [{node: cache[key] for node, key in keys.items()} for keys in all_keys]
+
+
+def _stack_branches(
+    kinds: Sequence[Event],
+    across_sizes: Sequence[float],
+    sequence_sizes: Sequence[float],
+    params: DrawParams,
+) -> Tuple[List[float], List[float]]:
+    """
+    Compute the positions of the branches that are stacked in a species.
+
+    Leaves, speciations and full losses are placed next to each other
+    across the trunk, and speciations and full losses are additionally
+    placed one after the other along the trunk, so that their positions
+    are the cumulative sums of the sizes of the preceding branches.
+
+    :param kinds: type of each branch
+    :param across_sizes: size of each branch across the trunk
+    :param sequence_sizes: size of each branch along the trunk
+    :param params: layout parameters
+    :returns: across and sequence coordinates of each branch (only
+        meaningful for stacked branches)
+    """
+    spacing = params.gene_branch_spacing
+    across_positions = []
+    sequence_positions = []
+    next_across: float = 0
+    next_sequence = params.species_branch_padding
+
+    for kind, across, sequence in zip(kinds, across_sizes, sequence_sizes):
+        if kind in _STACKED_ACROSS:
+            next_across -= across
+            across_positions.append(next_across)
+            next_across -= spacing
+        else:
+            across_positions.append(next_across)
+
+        sequence_positions.append(next_sequence)
+
+        if kind in _STACKED_SEQUENCE:
+            next_sequence += sequence
+            next_sequence += spacing
+
+    return across_positions, sequence_positions
+
+
+def _place_branches(  # pylint:disable=too-many-locals
+    kinds: Sequence[Event],
+    across_sizes: Sequence[float],
+    sequence_sizes: Sequence[float],
+    children: Sequence[Tuple[int, int]],
+    params: DrawParams,
+) -> Tuple[List[float], List[float]]:
+    """
+    Compute the relative position of the branches of a species.
+
+    This only works on parallel flat sequences of numbers indexed by
+    branch, so that no branch object, mapping or size tuple is looked up
+    while placing the branches.
+
+    :param kinds: type of each branch
+    :param across_sizes: size of each branch across the trunk
+    :param sequence_sizes: size of each branch along the trunk
+    :param children: indices of the left and right children of each
+        branch (-1 for a missing child), which must come before it
+    :param params: layout parameters
+    :returns: across and sequence coordinates of each branch
+    """
+    padding = params.species_branch_padding
+    stack_across, stack_sequence = _stack_branches(
+        kinds, across_sizes, sequence_sizes, params
+    )
+    across: List[float] = []
+    sequence: List[float] = []
+
+    for (
+        kind,
+        size_across,
+        size_sequence,
+        (left, right),
+        pos_across,
+        pos_sequence,
+    ) in zip(
+        kinds, across_sizes, sequence_sizes, children, stack_across, stack_sequence
+    ):
+        if kind is _LEAF:
+            pos_sequence = -size_sequence
+        elif kind in _STACKED_SEQUENCE:
+            pass
+        elif kind is _DUPLICATION:
+            pos_across = (
+                (across[left] + across_sizes[left] / 2)
+                + (across[right] + across_sizes[right] / 2)
+                - size_across
+            ) / 2
+            pos_sequence = (
+                min(padding, sequence[left], sequence[right]) - padding - size_sequence
+            )
+        elif kind is _TRANSFER:
+            pos_across = across[left] + across_sizes[left] / 2 - size_across / 2
+            pos_sequence = min(padding, sequence[left]) - padding - size_sequence
+        else:
+            raise ValueError("Invalid node type")
+
+        across.append(pos_across)
+        sequence.append(pos_sequence)
+
+    return across, sequence
 
 
 def _layout_branches(  # pylint:disable=too-many-locals
-    layout_state: Dict[TreeNode, Dict],
-    species_tree: Tree,
+    layout_state: LayoutState,
+    measures: Mapping[GeneAnchor, tex.MeasureBox],
     params: DrawParams,
 ):
     """Compute the size and relative position of each branch."""
-    branch_nodes = []
-    branches = []
+    axis = _AXES[params.orientation]
 
     for layout in layout_state.values():
-        for node, branch in layout["branches"].items():
-            branch_nodes.append(node)
-            branches.append((branch["kind"], branch["name"]))
-
-    measures = dict(zip(branch_nodes, measure_nodes(branches, params)))
-
-    for root_species in species_tree.traverse():
-        next_pos_across: float = 0
-        next_pos_sequence = params.species_branch_padding
-        layout = layout_state[root_species]
-        layout["anchors"] = {}
-
-        for root_gene, branch in layout["branches"].items():
-            size = (
-                measures[root_gene].overall_size()
-                if root_gene in measures
-                else Size(0, 0)
+        if not layout.branches:
+            continue
+
+        index = {root_gene: i for i, root_gene in enumerate(layout.branches)}
+        sizes = [
+            measures[root_gene].overall_size() if root_gene in measures else Size(0, 0)
+            for root_gene in layout.branches
+        ]
+        across_sizes = [size[axis.across] for size in sizes]
+        sequence_sizes = [size[axis.sequence] for size in sizes]
+        across, sequence = _place_branches(
+            [branch.kind for branch in layout.branches.values()],
+            across_sizes,
+            sequence_sizes,
+            [
+                (index.get(branch.left, -1), index.get(branch.right, -1))
+                for branch in layout.branches.values()
+            ],
+            params,
+        )
+
+        # Shift all nodes to the left or up to make room for the initial
+        # padding, while they are written to the branches
+        shift = (
+            min(
+                -(pos_across + size_across)
+                for pos_across, size_across in zip(across, across_sizes)
             )
+            - params.species_branch_padding
+        )
+        padding_shift = axis.point(shift, 0) if shift else None
 
-            if branch["kind"] == NodeEvent.LEAF:
-                if params.orientation == Orientation.VERTICAL:
-                    next_pos_across -= size.w
-                    pos = Position(next_pos_across, -size.h)
-                else:
-                    next_pos_across -= size.h
-                    pos = Position(-size.w, next_pos_across)
-
-                next_pos_across -= params.gene_branch_spacing
-            elif branch["kind"] in (
-                NodeEvent.SPECIATION,
-                EdgeEvent.FULL_LOSS,
-            ):
-                if params.orientation == Orientation.VERTICAL:
-                    next_pos_across -= size.w
-                    pos = Position(next_pos_across, next_pos_sequence)
-                    next_pos_sequence += size.h
-                else:
-                    next_pos_across -= size.h
-                    pos = Position(next_pos_sequence, next_pos_across)
-                    next_pos_sequence += size.w
-
-                next_pos_across -= params.gene_branch_spacing
-                next_pos_sequence += params.gene_branch_spacing
-            elif branch["kind"] == NodeEvent.DUPLICATION:
-                left_rect = layout["branches"][branch["left"]]["rect"]
-                right_rect = layout["branches"][branch["right"]]["rect"]
-
-                if params.orientation == Orientation.VERTICAL:
-                    across = ((left_rect.center() + right_rect.center()).x - size.w) / 2
-                    sequence = (
-                        min(
-                            params.species_branch_padding,
-                            left_rect.y,
-                            right_rect.y,
-                        )
-                        - params.species_branch_padding
-                        - size.h
-                    )
-                    pos = Position(across, sequence)
-                else:
-                    across = ((left_rect.center() + right_rect.center()).y - size.h) / 2
-                    sequence = (
-                        min(
-                            params.species_branch_padding,
-                            left_rect.x,
-                            right_rect.x,
-                        )
-                        - params.species_branch_padding
-                        - size.w
-                    )
-                    pos = Position(sequence, across)
-            elif branch["kind"] == NodeEvent.HORIZONTAL_TRANSFER:
-                cons_rect = layout["branches"][branch["left"]]["rect"]
-
-                if params.orientation == Orientation.VERTICAL:
-                    across = cons_rect.center().x - size.w / 2
-                    sequence = (
-                        min(params.species_branch_padding, cons_rect.y)
-                        - params.species_branch_padding
-                        - size.h
-                    )
-                    pos = Position(across, sequence)
-                else:
-                    across = cons_rect.center().y - size.h / 2
-                    sequence = (
-                        min(params.species_branch_padding, cons_rect.x)
-                        - params.species_branch_padding
-                        - size.w
-                    )
-                    pos = Position(sequence, across)
-            else:
-                raise ValueError("Invalid node type")
+        for (root_gene, branch), size, size_across, pos_across, pos_sequence in zip(
+            layout.branches.items(), sizes, across_sizes, across, sequence
+        ):
+            rect = branch.rect
+            rect.x, rect.y = axis.point(pos_across, pos_sequence)
+            rect.w, rect.h = size
 
-            rect = Rect.make_from(pos, size)
-            branch["rect"] = rect
+            if padding_shift is not None:
+                rect.shift(padding_shift)
 
-            if root_gene in layout["anchor_nodes"]:
-                if params.orientation == Orientation.VERTICAL:
-                    layout["anchors"][root_gene] = Position(rect.center().x, 0)
-                else:
-                    layout["anchors"][root_gene] = Position(0, rect.center().y)
-
-        del layout["anchor_nodes"]
-
-        # Shift all nodes to the left or up to make room
-        # for the initial padding
-        if layout["branches"]:
-            if params.orientation == Orientation.VERTICAL:
-                padding_shift = Position(
-                    x=(
-                        min(
-                            -branch["rect"].right().x
-                            for branch in layout["branches"].values()
-                        )
-                        - params.species_branch_padding
-                    ),
-                    y=0,
-                )
-            else:
-                padding_shift = Position(
-                    x=0,
-                    y=(
-                        min(
-                            -branch["rect"].bottom().y
-                            for branch in layout["branches"].values()
-                        )
-                        - params.species_branch_padding
-                    ),
-                )
+            if branch.is_anchor:
+                anchor = axis.point(pos_across + size_across / 2, 0)
 
-            for root_gene in layout["branches"]:
-                branch = layout["branches"][root_gene]
-                branch["rect"] += padding_shift
+                if padding_shift is not None:
+                    anchor += padding_shift
 
-            for root_gene in layout["anchors"]:
-                layout["anchors"][root_gene] += padding_shift
+                layout.anchors[root_gene] = anchor
 
 
 def _layout_subtrees(
-    layout_state: Dict[TreeNode, Dict],
-    species_tree: Tree,
+    layout_state: LayoutState,
+    species_postorder: Sequence[TreeNode],
+    species_preorder: Sequence[TreeNode],
     params: DrawParams,
-):
-    """Compute the size and absolute position of each subtree."""
+) -> Layout:
+    """
+    Compute the size and absolute position of each subtree, and turn
+    the computed layout into final immutable structures.
+    """
+    axis = _AXES[params.orientation]
+    result: Dict[TreeNode, SubtreeLayout] = {}
+    transfers: List[Tuple[TreeNode, GeneAnchor, _BranchState]] = []
+    default_color = Branch._field_defaults["color"]  # pylint:disable=protected-access
+    vertical = params.orientation == Orientation.VERTICAL
+
     # Compute the size of each subtree
-    for root_species in species_tree.traverse("postorder"):
+    for root_species in species_postorder:
         state = layout_state[root_species]
-
-        if state["branches"]:
-            if params.orientation == Orientation.VERTICAL:
-                trunk_width = (
-                    max(
-                        -branch["rect"].top_left().x
-                        for branch in state["branches"].values()
-                    )
-                    + params.species_branch_padding
-                )
-                trunk_height = (
-                    max(
-                        0,
-                        max(
-                            -branch["rect"].top_left().y
-                            for branch in state["branches"].values()
-                        ),
-                    )
-                    + params.trunk_overhead
-                )
-                fork_thickness = (
-                    max(
-                        0,
-                        max(
-                            branch["rect"].bottom_right().y
-                            for branch in state["branches"].values()
-                        ),
-                    )
-                    + params.species_branch_padding
-                )
-            else:
-                trunk_width = (
-                    max(
-                        0,
-                        max(
-                            -branch["rect"].top_left().x
-                            for branch in state["branches"].values()
-                        ),
-                    )
-                    + params.trunk_overhead
-                )
-                trunk_height = (
-                    max(
-                        -branch["rect"].top_left().y
-                        for branch in state["branches"].values()
-                    )
-                    + params.species_branch_padding
-                )
-                fork_thickness = (
-                    max(
-                        0,
-                        max(
-                            branch["rect"].bottom_right().x
-                            for branch in state["branches"].values()
-                        ),
-                    )
-                    + params.species_branch_padding
-                )
+        children = root_species.children
+
+        if state.branches:
+            # Find the extent of the branches in a single pass
+            rects = iter(branch.rect for branch in state.branches.values())
+            first = next(rects)
+            min_x, min_y = first.x, first.y
+            max_x, max_y = first.x + first.w, first.y + first.h
+
+            for rect in rects:
+                min_x = min(min_x, rect.x)
+                min_y = min(min_y, rect.y)
+                max_x = max(max_x, rect.x + rect.w)
+                max_y = max(max_y, rect.y + rect.h)
+
+            lower = Position(min_x, min_y)
+            upper = Position(max_x, max_y)
+            trunk_across = -lower[axis.across] + params.species_branch_padding
+            trunk_sequence = max(0, -lower[axis.sequence]) + params.trunk_overhead
+            fork_thickness = (
+                max(0, upper[axis.sequence]) + params.species_branch_padding
+            )
         else:
             # Empty subtree
             fork_thickness = 0
+            trunk_across = 0
+            trunk_sequence = params.trunk_overhead
 
-            if params.orientation == Orientation.VERTICAL:
-                trunk_width = 0
-                trunk_height = params.trunk_overhead
-            else:
-                trunk_width = params.trunk_overhead
-                trunk_height = 0
-
-        trunk_size = Size(trunk_width, trunk_height)
+        trunk_size = axis.size(trunk_across, trunk_sequence)
 
-        if root_species.is_leaf():
+        if not children:
             # Extant species
-            state["size"] = trunk_size
-            state["trunk"] = Rect.make_from(Position(0, 0), trunk_size)
-            state["fork_thickness"] = 0
+            state.size = trunk_size
+            state.trunk = Rect.make_from(Position(0, 0), trunk_size)
+            state.fork_thickness = 0
         else:
             # Ancestral species
-            left_species, right_species = root_species.children
-            left_info = layout_state[left_species]
-            right_info = layout_state[right_species]
-
-            if params.orientation == Orientation.VERTICAL:
-                subtree_span = (
-                    max(left_info["size"].h, right_info["size"].h) + trunk_height
-                )
-            else:
-                subtree_span = (
-                    max(left_info["size"].w, right_info["size"].w) + trunk_width
-                )
-
+            left_species, right_species = children
+            left_state = layout_state[left_species]
+            right_state = layout_state[right_species]
+            state.children = (left_state, right_state)
+            left_size = left_state.size
+            right_size = right_state.size
+            left_trunk = left_state.trunk
+            right_trunk = right_state.trunk
+
+            subtree_span = (
+                max(left_size[axis.sequence], right_size[axis.sequence])
+                + trunk_sequence
+            )
             subtree_span += params.level_spacing + fork_thickness
 
-            if params.orientation == Orientation.VERTICAL:
-                left_trunk_dist = left_info["size"].w - left_info["trunk"].right().x
-                right_trunk_dist = right_info["trunk"].left().x
-                subtree_spacing = max(
-                    trunk_width - (left_trunk_dist + right_trunk_dist),
-                    params.min_subtree_spacing,
-                )
-
-                state["size"] = Size(
-                    left_info["size"].w + subtree_spacing + right_info["size"].w,
-                    subtree_span,
-                )
-                state["left_pos"] = Position(
-                    0,
-                    subtree_span - left_info["size"].h,
-                )
-                state["right_pos"] = Position(
-                    left_info["size"].w + subtree_spacing,
-                    subtree_span - right_info["size"].h,
-                )
-                trunk_pos = Position(
-                    left_info["size"].w + (subtree_spacing - trunk_width) / 2,
-                    0,
-                )
-            else:
-                left_trunk_dist = left_info["size"].h - left_info["trunk"].bottom().y
-                right_trunk_dist = right_info["trunk"].top().y
-                subtree_spacing = max(
-                    trunk_height - (left_trunk_dist + right_trunk_dist),
-                    params.min_subtree_spacing,
-                )
+            left_trunk_dist = (
+                left_size[axis.across] - left_trunk.bottom_right()[axis.across]
+            )
+            right_trunk_dist = right_trunk.top_left()[axis.across]
+            subtree_spacing = max(
+                trunk_across - (left_trunk_dist + right_trunk_dist),
+                params.min_subtree_spacing,
+            )
 
-                state["size"] = Size(
-                    subtree_span,
-                    left_info["size"].h + subtree_spacing + right_info["size"].h,
-                )
-                state["left_pos"] = Position(
-                    subtree_span - left_info["size"].w,
-                    0,
-                )
-                state["right_pos"] = Position(
-                    subtree_span - right_info["size"].w,
-                    left_info["size"].h + subtree_spacing,
-                )
-                trunk_pos = Position(
-                    0,
-                    left_info["size"].h + (subtree_spacing - trunk_height) / 2,
-                )
+            state.size = axis.size(
+                left_size[axis.across] + subtree_spacing + right_size[axis.across],
+                subtree_span,
+            )
+            state.left_pos = axis.point(
+                0,
+                subtree_span - left_size[axis.sequence],
+            )
+            state.right_pos = axis.point(
+                left_size[axis.across] + subtree_spacing,
+                subtree_span - right_size[axis.sequence],
+            )
+            trunk_pos = axis.point(
+                left_size[axis.across] + (subtree_spacing - trunk_across) / 2,
+                0,
+            )
 
-            state["trunk"] = Rect.make_from(trunk_pos, trunk_size)
-            state["fork_thickness"] = fork_thickness
+            state.trunk = Rect.make_from(trunk_pos, trunk_size)
+            state.fork_thickness = fork_thickness
 
     # Compute the absolute position of each subtree
-    layout_state[species_tree]["rect"] = Rect.make_from(
-        position=Position(0, 0),
-        size=layout_state[species_tree]["size"],
-    )
-    del layout_state[species_tree]["size"]
+    root_state = layout_state[species_preorder[0]]
+    root_state.rect = Rect.make_from(position=Position(0, 0), size=root_state.size)
 
-    for root_species in species_tree.traverse("preorder"):
+    for root_species in species_preorder:
         this_layout = layout_state[root_species]
-        this_rect = this_layout["rect"]
+        this_rect = this_layout.rect
 
         # Position child subtrees
-        if not root_species.is_leaf():
-            left_species, right_species = root_species.children
-
-            layout_state[left_species]["rect"] = Rect.make_from(
-                position=this_rect.top_left() + this_layout["left_pos"],
-                size=layout_state[left_species]["size"],
+        if this_layout.children:
+            left_state, right_state = this_layout.children
+            left_state.rect = Rect.make_from(
+                position=this_rect.top_left() + this_layout.left_pos,
+                size=left_state.size,
             )
-            del this_layout["left_pos"]
-            del layout_state[left_species]["size"]
-
-            layout_state[right_species]["rect"] = Rect.make_from(
-                position=this_rect.top_left() + this_layout["right_pos"],
-                size=layout_state[right_species]["size"],
+            right_state.rect = Rect.make_from(
+                position=this_rect.top_left() + this_layout.right_pos,
+                size=right_state.size,
             )
-            del this_layout["right_pos"]
-            del layout_state[right_species]["size"]
 
         # Make trunk, anchor, and branch nodes positions absolute
         # and compute branch anchors
-        this_layout["trunk"] += this_rect.top_left()
-        trunk_rect = this_layout["trunk"]
-
-        for anchor in this_layout["anchors"]:
-            if params.orientation == Orientation.VERTICAL:
-                this_layout["anchors"][anchor] += trunk_rect.top_right()
+        this_layout.trunk += this_rect.top_left()
+        trunk_rect = this_layout.trunk
+        anchor_shift = trunk_rect.top_right() if vertical else trunk_rect.bottom_left()
+        branch_shift = trunk_rect.bottom_right()
+        anchors = this_layout.anchors
+
+        for anchor in anchors:
+            anchors[anchor] += anchor_shift
+
+        branches: Dict[GeneAnchor, Branch] = {}
+
+        for gene, branch in this_layout.branches.items():
+            branch_rect = branch.rect
+            branch_rect.shift(branch_shift)
+
+            if branch.kind is _FULL_LOSS:
+                anchor_parent = anchor_left = branch_rect.center()
+                anchor_right = anchor_child = anchor_parent
+            elif vertical:
+                anchor_parent = branch_rect.top()
+                anchor_left = branch_rect.left()
+                anchor_right = branch_rect.right()
+                anchor_child = branch_rect.bottom()
             else:
-                this_layout["anchors"][anchor] += trunk_rect.bottom_left()
+                anchor_parent = branch_rect.left()
+                anchor_left = branch_rect.top()
+                anchor_right = branch_rect.bottom()
+                anchor_child = branch_rect.right()
+
+            branches[gene] = Branch(
+                branch.kind,
+                branch_rect.to_rect(),
+                anchor_parent,
+                anchor_left,
+                anchor_right,
+                anchor_child,
+                branch.name,
+                default_color if branch.color is None else branch.color,
+                branch.left,
+                branch.right,
+            )
 
-        for branch in this_layout["branches"].values():
-            branch["rect"] += trunk_rect.bottom_right()
-            branch_rect = branch["rect"]
+            if branch.foreign_species is not None:
+                transfers.append((root_species, gene, branch))
+
+        # Turn the subtree into its final immutable structure
+        result[root_species] = SubtreeLayout(
+            rect=this_rect,
+            trunk=trunk_rect,
+            fork_thickness=this_layout.fork_thickness,
+            anchors=this_layout.anchors,
+            branches=branches,
+        )
+
+    # Resolve the destination of transfers once all anchors are final
+    for root_species, gene, branch in transfers:
+        branches = result[root_species].branches
+        branches[gene] = branches[gene]._replace(
+            anchor_foreign=result[branch.foreign_species].anchors[branch.right]
+        )
 
-            if branch["kind"] == EdgeEvent.FULL_LOSS:
-                branch["anchor_parent"] = branch_rect.center()
-                branch["anchor_left"] = branch_rect.center()
-                branch["anchor_right"] = branch_rect.center()
-                branch["anchor_child"] = branch_rect.center()
-            else:
-                if params.orientation == Orientation.VERTICAL:
-                    branch["anchor_parent"] = branch_rect.top()
-                    branch["anchor_left"] = branch_rect.left()
-                    branch["anchor_right"] = branch_rect.right()
-                    branch["anchor_child"] = branch_rect.bottom()
-                else:
-                    branch["anchor_parent"] = branch_rect.left()
-                    branch["anchor_left"] = branch_rect.top()
-                    branch["anchor_right"] = branch_rect.bottom()
-                    branch["anchor_child"] = branch_rect.right()
+    return result
 
 
-def _finalize_layout(
-    layout_state: Dict[TreeNode, Dict],
-    species_tree: Tree,
-) -> Layout:
-    """Turn a computed layout into final immutable structures."""
-    result: Dict[TreeNode, SubtreeLayout] = {}
+def compute_many(
+    recs: Sequence[ReconciliationOutput],
+    params: Optional[DrawParams] = None,
+    cache: Optional[MeasureCache] = None,
+    jobs: int = 1,
+) -> List[Layout]:
+    """
+    Compute the layouts of several gene trees embedded in species trees.
+
+    This is equivalent to calling :func:`compute` on each reconciliation,
+    except that the nodes of all reconciliations are measured in a single
+    TeX run, which amortizes the startup cost of the TeX compiler.
+
+    :param recs: reconciliation objects to lay out
+    :param params: layout parameters, or None to use the defaults
+    :param cache: if not None, node measurements are looked up in and
+        added to this cache, so that layouts recomputed after small
+        changes only measure the nodes that changed
+    :param jobs: maximum number of TeX runs to use in parallel for
+        measuring nodes, which can speed up the layout of large trees
+    :returns: layout information for each reconciliation, in order
+    """
+    if params is None:
+        params = DrawParams()
 
-    for root_species in species_tree.traverse("preorder"):
-        this_layout = layout_state[root_species]
+    layout_states: List[LayoutState] = []
+    species_orders: List[Tuple[List[TreeNode], Sequence[TreeNode]]] = []
+
+    for rec in recs:
+        # Traverse each species tree once and share the resulting
+        # node lists between all layout passes
+        species_postorder = list(rec.input.species_lca.tree.traverse("postorder"))
+        species_preorder = rec.input.species_lca.preorder
+        species_orders.append((species_postorder, species_preorder))
 
-        for anchor, branch in this_layout["branches"].items():
-            this_layout["branches"][anchor] = Branch(**branch)
+        layout_state: LayoutState = {}
+        _compute_branches(layout_state, rec, species_postorder, params)
+        layout_states.append(layout_state)
+
+    measures = _measure_branches(
+        layout_states, params, cache if cache is not None else {}, jobs
+    )
+    result = []
 
-        result[root_species] = SubtreeLayout(**layout_state[root_species])
+    for layout_state, layout_measures, (species_postorder, species_preorder) in zip(
+        layout_states, measures, species_orders
+    ):
+        _layout_branches(layout_state, layout_measures, params)
+        result.append(
+            _layout_subtrees(layout_state, species_postorder, species_preorder, params)
+        )
 
     return result
 
@@ -610,6 +846,8 @@ def _finalize_layout(
 def compute(
     rec: ReconciliationOutput,
     params: DrawParams = DrawParams(),
+    cache: Optional[MeasureCache] = None,
+    jobs: int = 1,
 ) -> Layout:
     """
     Compute the layout of a gene tree embedded in a species tree.
@@ -617,11 +855,8 @@ def compute(
     :param rec: reconciliation object defining the gene and species trees
         their embedding, and an optional synteny labelling
     :param params: layout parameters
+    :param cache: see :func:`compute_many`
+    :param jobs: see :func:`compute_many`
     :returns: layout information for each species node
     """
-    layout_state: Dict[TreeNode, Dict] = {}
-    species_tree = rec.input.species_lca.tree
-    _compute_branches(layout_state, rec, params)
-    _layout_branches(layout_state, species_tree, params)
-    _layout_subtrees(layout_state, species_tree, params)
-    return _finalize_layout(layout_state, species_tree)
+    return compute_many([rec], params, cache, jobs)[0]
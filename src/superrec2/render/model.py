@@ -52,10 +52,17 @@ class Branch(NamedTuple):
     left: Optional[TreeNode] = None
     right: Optional[TreeNode] = None
 
+    # Anchor point of the transfered copy in the species that receives it
+    # (for horizontal gene transfers)
+    anchor_foreign: Optional[Position] = None
+
 
 class PseudoGene:  # pylint:disable=too-few-public-methods
     """Objects used as virtual nodes for lost genes."""
 
+    # Pseudo-genes carry no data and are only compared by identity
+    __slots__ = ()
+
 
 GeneAnchor = Union[TreeNode, PseudoGene]
 
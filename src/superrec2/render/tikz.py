@@ -1,8 +1,10 @@
 """Generate a TikZ drawing from a reconciliation layout."""
-from typing import Callable, Dict, List, Sequence, Optional, Tuple
+import io
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Sequence, Optional, Tuple
 import textwrap
 from ete3 import TreeNode
-from .model import DrawParams, Orientation, SubtreeLayout, Layout
+from .model import Branch, DrawParams, Orientation, SubtreeLayout, Layout
 from ..utils import tex
 from ..utils.text import balanced_wrap
 from ..model.reconciliation import (
@@ -11,18 +13,17 @@ from ..model.reconciliation import (
     EdgeEvent,
     ReconciliationOutput,
 )
-from ..model.tree_mapping import TreeMapping
 from ..utils.geometry import Position
 
-
 # Round all coordinates to this number of places in generated TikZ code
 MAX_DIGITS = 4
 
 
-def get_tikz_definitions(params: DrawParams):
-    """Get TikZ definitions matching a set of drawing parameters."""
-    if params.orientation == Orientation.VERTICAL:
-        leaf_label_style = textwrap.dedent(
+# Label styles for each orientation, indented to their place in the
+# definitions template
+_LEAF_LABEL_STYLE = {
+    Orientation.VERTICAL: textwrap.indent(
+        textwrap.dedent(
             r"""
             [font={\strut\color{#1}},
                 align=center,
@@ -30,18 +31,11 @@ def get_tikz_definitions(params: DrawParams):
                 outer xsep=0pt, outer ysep=0pt]
             below:#2
             """
-        )
-        species_label_style = textwrap.dedent(
-            rf"""
-            font=\bfseries,
-            midway,
-            anchor=north,
-            align=center,
-            yshift=-{params.species_label_spacing},
-            """
-        )
-    else:
-        leaf_label_style = textwrap.dedent(
+        ),
+        " " * 12,
+    ).strip(),
+    Orientation.HORIZONTAL: textwrap.indent(
+        textwrap.dedent(
             r"""
             [font={\color{#1}},
                 align=justify,
@@ -49,249 +43,504 @@ def get_tikz_definitions(params: DrawParams):
                 outer xsep=0pt, outer ysep=0pt]
             right:#2
             """
-        )
-        species_label_style = textwrap.dedent(
-            rf"""
+        ),
+        " " * 12,
+    ).strip(),
+}
+
+_SPECIES_LABEL_STYLE = {
+    Orientation.VERTICAL: textwrap.indent(
+        textwrap.dedent(
+            r"""
+            font=\bfseries,
+            midway,
+            anchor=north,
+            align=center,
+            yshift=-{spacing},
+            """
+        ),
+        " " * 8,
+    ).strip(),
+    Orientation.HORIZONTAL: textwrap.indent(
+        textwrap.dedent(
+            r"""
             font=\bfseries,
             midway,
             anchor=west,
             align=left,
-            xshift={params.species_label_spacing},
+            xshift={spacing},
             """
-        )
+        ),
+        " " * 8,
+    ).strip(),
+}
 
-    return textwrap.dedent(
-        rf"""
-        \colorlet{{species background color}}{{black!15}}
-        \tikzset{{
-            x={{{params.x_unit}}},
-            y={{-{params.y_unit}}},
-            species background/.style={{
-                fill=species background color,
-                draw=species background color,
-                line width={{{params.species_border_thickness}}},
-            }},
-            species label/.style={{
-                {textwrap.indent(species_label_style, " " * 16).strip()}
-            }},
-            branch/.style={{
-                draw={{#1}},
-                line width={{{params.branch_thickness}}},
-            }},
-            transfer branch/.style={{
-                branch={{#1}},
-                -Stealth,
-            }},
-            loss/.style={{
-                draw={{#1}}, cross out, thick,
-                line width={{{params.branch_thickness}}},
-                inner sep=0pt,
-                outer sep=0pt,
-                minimum width={{{params.loss_size}}},
-                minimum height={{{params.loss_size}}},
-            }},
-            extant gene/.style 2 args={{
-                circle, fill={{#1}},
-                outer sep=0pt, inner sep=0pt,
-                minimum size={{{params.extant_gene_diameter}}},
-                label={{
-                    {textwrap.indent(leaf_label_style, " " * 20).strip()}
-                }},
-            }},
-            extant gene/.default={{black}}{{}},
-            branch node/.style={{
-                draw={{#1}}, fill={{species background color!50!white}},
-                align=center,
-                font={{\color{{#1}}}},
-                outer sep=0pt, inner xsep=0pt, inner ysep=2pt,
-                line width={{{params.branch_thickness}}},
-            }},
-            branch node/.default={{black}},
-            speciation/.style={{
-                branch node={{#1}}, rectangle, rounded corners,
-                inner xsep=4pt,
-                minimum width={{{params.speciation_size}}},
-                minimum height={{{params.speciation_size}}},
-            }},
-            duplication/.style={{
-                branch node={{#1}}, rectangle,
-                inner xsep=4pt,
-                minimum width={{{params.duplication_size}}},
-                minimum height={{{params.duplication_size}}},
-            }},
-            horizontal gene transfer/.style={{
-                branch node={{#1}}, chamfered rectangle,
-                chamfered rectangle sep={{{params.transfer_size} / 2.4}},
-                inner xsep=2pt,
-                inner ysep=-1pt,
-                minimum width={{{params.transfer_size}}},
-                minimum height={{{params.transfer_size}}},
+
+# TikZ definitions, to be formatted with the drawing parameters
+_DEFINITIONS_TEMPLATE = textwrap.dedent(
+    r"""
+    \colorlet{{species background color}}{{black!15}}
+    \tikzset{{
+        x={{{params.x_unit}}},
+        y={{-{params.y_unit}}},
+        species background/.style={{
+            fill=species background color,
+            draw=species background color,
+            line width={{{params.species_border_thickness}}},
+        }},
+        species label/.style={{
+            {species_label_style}
+        }},
+        branch/.style={{
+            draw={{#1}},
+            line width={{{params.branch_thickness}}},
+        }},
+        transfer branch/.style={{
+            branch={{#1}},
+            -Stealth,
+        }},
+        loss/.style={{
+            draw={{#1}}, cross out, thick,
+            line width={{{params.branch_thickness}}},
+            inner sep=0pt,
+            outer sep=0pt,
+            minimum width={{{params.loss_size}}},
+            minimum height={{{params.loss_size}}},
+        }},
+        extant gene/.style 2 args={{
+            circle, fill={{#1}},
+            outer sep=0pt, inner sep=0pt,
+            minimum size={{{params.extant_gene_diameter}}},
+            label={{
+                {leaf_label_style}
             }},
-        }}"""
-    ).lstrip()
+        }},
+        extant gene/.default={{black}}{{}},
+        branch node/.style={{
+            draw={{#1}}, fill={{species background color!50!white}},
+            align=center,
+            font={{\color{{#1}}}},
+            outer sep=0pt, inner xsep=0pt, inner ysep=2pt,
+            line width={{{params.branch_thickness}}},
+        }},
+        branch node/.default={{black}},
+        speciation/.style={{
+            branch node={{#1}}, rectangle, rounded corners,
+            inner xsep=4pt,
+            minimum width={{{params.speciation_size}}},
+            minimum height={{{params.speciation_size}}},
+        }},
+        duplication/.style={{
+            branch node={{#1}}, rectangle,
+            inner xsep=4pt,
+            minimum width={{{params.duplication_size}}},
+            minimum height={{{params.duplication_size}}},
+        }},
+        horizontal gene transfer/.style={{
+            branch node={{#1}}, chamfered rectangle,
+            chamfered rectangle sep={{{params.transfer_size} / 2.4}},
+            inner xsep=2pt,
+            inner ysep=-1pt,
+            minimum width={{{params.transfer_size}}},
+            minimum height={{{params.transfer_size}}},
+        }},
+    }}"""
+).lstrip()
+
+
+@lru_cache(maxsize=32)
+def get_tikz_definitions(params: DrawParams):
+    """
+    Get TikZ definitions matching a set of drawing parameters.
+
+    Definitions are cached since they are needed both for measuring
+    and for rendering, usually with the same parameters each time.
+    """
+    return _DEFINITIONS_TEMPLATE.format(
+        params=params,
+        leaf_label_style=_LEAF_LABEL_STYLE[params.orientation],
+        species_label_style=_SPECIES_LABEL_STYLE[params.orientation].format(
+            spacing=params.species_label_spacing
+        ),
+    )
+
+
+# TikZ code used to measure each kind of event node, given its label
+_MEASURE_TEMPLATES = {
+    NodeEvent.LEAF: r"\tikz\node[extant gene={{black}}{{{}}}] {{}};",
+    NodeEvent.SPECIATION: r"\tikz\node[speciation] {{{}}};",
+    NodeEvent.DUPLICATION: r"\tikz\node[duplication] {{{}}};",
+    NodeEvent.HORIZONTAL_TRANSFER: r"\tikz\node[horizontal gene transfer] {{{}}};",
+    EdgeEvent.FULL_LOSS: r"\tikz\node[loss] {{{}}};",
+}
 
 
 def measure_nodes(
     nodes: Sequence[Tuple[Event, str]],
     params: DrawParams,
+    jobs: int = 1,
 ) -> Sequence[tex.MeasureBox]:
     """
     Measure the overall space occupied by each node in a set of nodes.
 
+    Nodes that generate the same TikZ code are only measured once. Callers
+    that measure the same nodes repeatedly should keep the results, as
+    :func:`layout.compute_many` does with its measure cache.
+
     :param nodes: event nodes to measure
     :param params: drawing settings
+    :param jobs: maximum number of parallel TeX runs (see :func:`tex.measure`)
     :returns: list of measurements, in the same order as the node sequence
     """
-    boxes = []
+    boxes: Dict[str, int] = {}
+    indices = []
 
     for kind, name in nodes:
-        if kind == NodeEvent.LEAF:
-            boxes.append(rf"\tikz\node[extant gene={{black}}{{{name}}}] {{}};")
-        else:
-            if kind == NodeEvent.SPECIATION:
-                node_type = "[speciation]"
-            elif kind == NodeEvent.DUPLICATION:
-                node_type = "[duplication]"
-            elif kind == NodeEvent.HORIZONTAL_TRANSFER:
-                node_type = "[horizontal gene transfer]"
-            elif kind == EdgeEvent.FULL_LOSS:
-                node_type = "[loss]"
-            else:
-                raise ValueError("Invalid node type")
+        if kind not in _MEASURE_TEMPLATES:
+            raise ValueError("Invalid node type")
 
-            boxes.append(rf"\tikz\node{node_type} {{{name}}};")
+        box = _MEASURE_TEMPLATES[kind].format(name)
+        indices.append(boxes.setdefault(box, len(boxes)))
 
-    return tex.measure(
+    measures = tex.measure(
         boxes,
         preamble=(
             r"\usepackage{tikz}"
             r"\usetikzlibrary{arrows.meta}"
             r"\usetikzlibrary{shapes}" + get_tikz_definitions(params)
         ),
+        jobs=jobs,
+    )
+    return [measures[index] for index in indices]
+
+
+Path = Tuple[Position, ...]
+
+
+def _fork_paths_vertical(
+    layout: SubtreeLayout,
+    left_layout: SubtreeLayout,
+    right_layout: SubtreeLayout,
+) -> Tuple[Path, Path, Path]:
+    """Get the left, right and inner outlines of a top-down fork."""
+    trunk = layout.trunk
+    bottom_left = trunk.bottom_left()
+    bottom_right = trunk.bottom_right()
+    left_outer = left_layout.trunk.top_left()
+    left_inner = left_layout.trunk.top_right()
+    right_outer = right_layout.trunk.top_right()
+    right_inner = right_layout.trunk.top_left()
+
+    left_fork = (
+        left_outer,
+        left_outer.meet_vh(bottom_left),
+        bottom_left,
+        trunk.top_left(),
+    )
+    right_fork = (
+        right_outer,
+        right_outer.meet_vh(bottom_right),
+        bottom_right,
+        trunk.top_right(),
+    )
+    fork_join = bottom_left + Position(0, layout.fork_thickness)
+    inner_fork = (
+        left_inner,
+        left_inner.meet_vh(fork_join),
+        fork_join.meet_hv(right_inner),
+        right_inner,
+    )
+    return left_fork, right_fork, inner_fork
+
+
+def _fork_paths_horizontal(
+    layout: SubtreeLayout,
+    left_layout: SubtreeLayout,
+    right_layout: SubtreeLayout,
+) -> Tuple[Path, Path, Path]:
+    """Get the left, right and inner outlines of a left-to-right fork."""
+    trunk = layout.trunk
+    top_right = trunk.top_right()
+    bottom_right = trunk.bottom_right()
+    left_outer = left_layout.trunk.top_left()
+    left_inner = left_layout.trunk.bottom_left()
+    right_outer = right_layout.trunk.bottom_left()
+    right_inner = right_layout.trunk.top_left()
+
+    left_fork = (
+        left_outer,
+        left_outer.meet_hv(top_right),
+        top_right,
+        trunk.top_left(),
+    )
+    right_fork = (
+        right_outer,
+        right_outer.meet_hv(bottom_right),
+        bottom_right,
+        trunk.bottom_left(),
+    )
+    fork_join = bottom_right + Position(layout.fork_thickness, 0)
+    inner_fork = (
+        left_inner,
+        left_inner.meet_hv(fork_join),
+        fork_join.meet_vh(right_inner),
+        right_inner,
+    )
+    return left_fork, right_fork, inner_fork
+
+
+def _leaf_path_vertical(layout: SubtreeLayout, params: DrawParams) -> Path:
+    """Get the outline of a top-down species leaf."""
+    leaf_shift = Position(0, params.species_leaf_spacing)
+    return (
+        layout.trunk.top_left(),
+        layout.trunk.bottom_left() + leaf_shift,
+        layout.trunk.bottom_right() + leaf_shift,
+        layout.trunk.top_right(),
+    )
+
+
+def _leaf_path_horizontal(layout: SubtreeLayout, params: DrawParams) -> Path:
+    """Get the outline of a left-to-right species leaf."""
+    leaf_shift = Position(params.species_leaf_spacing, 0)
+    return (
+        layout.trunk.top_left(),
+        layout.trunk.top_right() + leaf_shift,
+        layout.trunk.bottom_right() + leaf_shift,
+        layout.trunk.bottom_left(),
     )
 
 
+def _extant_gene_pos_vertical(branch: Branch, params: DrawParams) -> Position:
+    """Get the position of an extant gene in a top-down layout."""
+    return branch.rect.top() + Position(0, params.extant_gene_diameter / 2)
+
+
+def _extant_gene_pos_horizontal(branch: Branch, params: DrawParams) -> Position:
+    """Get the position of an extant gene in a left-to-right layout."""
+    return branch.rect.left() + Position(params.extant_gene_diameter / 2, 0)
+
+
+def _loss_pos_vertical(
+    layout: SubtreeLayout, branch_pos: Position, left_lost: bool
+) -> Position:
+    """Get the position of a gene loss in a top-down layout."""
+    trunk = layout.trunk
+
+    if left_lost:
+        return Position(trunk.x, branch_pos.y)
+
+    return Position(trunk.x + trunk.w, branch_pos.y)
+
+
+def _loss_pos_horizontal(
+    layout: SubtreeLayout, branch_pos: Position, left_lost: bool
+) -> Position:
+    """Get the position of a gene loss in a left-to-right layout."""
+    trunk = layout.trunk
+
+    if left_lost:
+        return Position(branch_pos.x, trunk.y)
+
+    return Position(branch_pos.x, trunk.y + trunk.h)
+
+
+def _transfer_out_vertical(
+    branch: Branch, branch_pos: Position, foreign_pos: Position
+) -> Tuple[Position, str]:
+    """Get the start anchor and bend of a top-down transfer edge."""
+    if branch_pos.x < foreign_pos.x:
+        return branch.anchor_right, "out=0, in=180"
+
+    return branch.anchor_left, "out=180, in=0"
+
+
+def _transfer_out_horizontal(
+    branch: Branch, branch_pos: Position, foreign_pos: Position
+) -> Tuple[Position, str]:
+    """Get the start anchor and bend of a left-to-right transfer edge."""
+    if branch_pos.y > foreign_pos.y:
+        return branch.anchor_left, "out=90, in=-90"
+
+    return branch.anchor_right, "out=-90, in=90"
+
+
+# Branch kinds that drawing dispatches on, bound to module globals
+_LEAF = NodeEvent.LEAF
+_SPECIATION = NodeEvent.SPECIATION
+_DUPLICATION = NodeEvent.DUPLICATION
+_TRANSFER = NodeEvent.HORIZONTAL_TRANSFER
+_FULL_LOSS = EdgeEvent.FULL_LOSS
+
+# TikZ path operations used to link two coordinates, shared by all the
+# emitted commands: a straight line, or a right angle going vertically
+# or horizontally first
+_STRAIGHT = "--"
+_VERTICAL_FIRST = "|-"
+_HORIZONTAL_FIRST = "-|"
+
+
+class _Drawing(NamedTuple):
+    """Orientation-specific parts of a drawing, selected once per render."""
+
+    # Path operations linking a fork node to its left and right children
+    fork_links: Tuple[str, str]
+
+    # Outlines of internal species forks
+    fork_paths: Callable[
+        [SubtreeLayout, SubtreeLayout, SubtreeLayout], Tuple[Path, Path, Path]
+    ]
+
+    # Outlines of species leaves
+    leaf_path: Callable[[SubtreeLayout, DrawParams], Path]
+
+    # Positions of extant genes
+    extant_gene_pos: Callable[[Branch, DrawParams], Position]
+
+    # Positions of gene losses
+    loss_pos: Callable[[SubtreeLayout, Position, bool], Position]
+
+    # Start anchors and bends of transfer edges
+    transfer_out: Callable[[Branch, Position, Position], Tuple[Position, str]]
+
+
+_DRAWINGS = {
+    Orientation.VERTICAL: _Drawing(
+        fork_links=(_VERTICAL_FIRST, _HORIZONTAL_FIRST),
+        fork_paths=_fork_paths_vertical,
+        leaf_path=_leaf_path_vertical,
+        extant_gene_pos=_extant_gene_pos_vertical,
+        loss_pos=_loss_pos_vertical,
+        transfer_out=_transfer_out_vertical,
+    ),
+    Orientation.HORIZONTAL: _Drawing(
+        fork_links=(_HORIZONTAL_FIRST, _VERTICAL_FIRST),
+        fork_paths=_fork_paths_horizontal,
+        leaf_path=_leaf_path_horizontal,
+        extant_gene_pos=_extant_gene_pos_horizontal,
+        loss_pos=_loss_pos_horizontal,
+        transfer_out=_transfer_out_horizontal,
+    ),
+}
+
+
+def _with_digits(template: str) -> str:
+    """Round all coordinates of a template to :data:`MAX_DIGITS` places."""
+    return template.replace("{digits}", str(MAX_DIGITS))
+
+
+# Templates of the TikZ commands emitted for each part of the drawing,
+# prepared once so that formatting them only fills in the fields
+_FORK_TEMPLATE = _with_digits(
+    r"\path[species background] ({left[0]:{digits}})"
+    r" [rounded corners={{{rounding}}}] -- ({left[1]:{digits}})"
+    r" -- ({left[2]:{digits}})"
+    r" [sharp corners] -- ({left[3]:{digits}})"
+    r" -- ({right[3]:{digits}})"
+    r" [rounded corners={{{rounding}}}] -- ({right[2]:{digits}})"
+    r" -- ({right[1]:{digits}})"
+    r" [sharp corners] -- ({right[0]:{digits}})"
+    r" -- ({inner[3]:{digits}})"
+    r" [rounded corners={{{rounding}}}] -- ({inner[2]:{digits}})"
+    r" -- ({inner[1]:{digits}})"
+    r" [sharp corners] -- ({inner[0]:{digits}})"
+    r" -- cycle;"
+    "\n"
+)
+_LEAF_TEMPLATE = _with_digits(
+    r"\path[species background, rounded corners={{{rounding}}}]"
+    r" ({path[0]:{digits}}) -- ({path[1]:{digits}})"
+    r" -- node[species label] {{{name}}}"
+    r" ({path[2]:{digits}}) -- ({path[3]:{digits}});"
+    "\n"
+)
+_BRANCH_TEMPLATE = _with_digits(
+    r"\path[branch={{{color}}}] ({start:{digits}}) {link} ({end:{digits}});" "\n"
+)
+_FORK_BRANCH_TEMPLATE = _with_digits(
+    r"\path[branch={{{color}}}] ({left:{digits}}) {links[0]}"
+    r" ({left_anchor:{digits}}) ({right_anchor:{digits}}) {links[1]}"
+    r" ({right:{digits}});"
+    "\n"
+)
+_TRANSFER_TEMPLATE = _with_digits(
+    r"\path[transfer branch={{{color}}}] ({start:{digits}})"
+    r" to[{bend}] ({end:{digits}});"
+    "\n"
+)
+_EXTANT_GENE_TEMPLATE = _with_digits(
+    r"\node[extant gene={{{color}}}{{{name}}}] at ({pos:{digits}}) {{}};" "\n"
+)
+_COLOR_TEMPLATE = r"\definecolor{{{name}}}{{HTML}}{{{html}}}" "\n"
+_LOSS_TEMPLATE = _with_digits(r"\node[loss={{{color}}}] at ({pos:{digits}}) {{}};" "\n")
+_EVENT_TEMPLATE = _with_digits(
+    r"\node[{style}={{{color}}}] at ({pos:{digits}}) {{{name}}};" "\n"
+)
+
+# Output layers, in drawing order
+_LAYERS = ("background", "gene branches", "gene transfers", "events")
+
+
+class _Layers(NamedTuple):
+    """Functions that append TikZ code to each output layer."""
+
+    background: Callable[[str], Optional[int]]
+    gene_branches: Callable[[str], Optional[int]]
+    gene_transfers: Callable[[str], Optional[int]]
+    events: Callable[[str], Optional[int]]
+
+
+@lru_cache(maxsize=1024)
+def _species_label(name: str, width: Optional[int]) -> str:
+    """
+    Escape and wrap the label of a species leaf.
+
+    Labels are cached since the same species trees are usually drawn
+    many times over, e.g. with different reconciliations or parameters.
+    """
+    label = tex.escape(name)
+
+    if width is not None:
+        label = balanced_wrap(label, width).replace("\n", "\\\\")
+
+    return label
+
+
 def _tikz_draw_fork(  # pylint:disable=too-many-arguments
     species_node: TreeNode,
     layout: SubtreeLayout,
     left_layout: Optional[SubtreeLayout],
     right_layout: Optional[SubtreeLayout],
-    layers: Dict[str, List[str]],
+    layers: _Layers,
+    drawing: _Drawing,
     params: DrawParams,
 ) -> None:
     """Draw the exterior fork of a species subtree."""
-    if not species_node.is_leaf():
+    if left_layout is not None:
         # Draw fork
-        assert left_layout is not None
         assert right_layout is not None
 
-        if params.orientation == Orientation.VERTICAL:
-            left_fork = (
-                left_layout.trunk.top_left(),
-                left_layout.trunk.top_left().meet_vh(layout.trunk.bottom_left()),
-                layout.trunk.bottom_left(),
-                layout.trunk.top_left(),
-            )
-            right_fork = (
-                right_layout.trunk.top_right(),
-                right_layout.trunk.top_right().meet_vh(layout.trunk.bottom_right()),
-                layout.trunk.bottom_right(),
-                layout.trunk.top_right(),
-            )
-            fork_join = layout.trunk.bottom_left() + Position(0, layout.fork_thickness)
-            inner_fork = (
-                left_layout.trunk.top_right(),
-                left_layout.trunk.top_right().meet_vh(fork_join),
-                fork_join.meet_hv(right_layout.trunk.top_left()),
-                right_layout.trunk.top_left(),
-            )
-        else:
-            left_fork = (
-                left_layout.trunk.top_left(),
-                left_layout.trunk.top_left().meet_hv(layout.trunk.top_right()),
-                layout.trunk.top_right(),
-                layout.trunk.top_left(),
-            )
-            right_fork = (
-                right_layout.trunk.bottom_left(),
-                right_layout.trunk.bottom_left().meet_hv(layout.trunk.bottom_right()),
-                layout.trunk.bottom_right(),
-                layout.trunk.bottom_left(),
-            )
-            fork_join = layout.trunk.bottom_right() + Position(layout.fork_thickness, 0)
-            inner_fork = (
-                left_layout.trunk.bottom_left(),
-                left_layout.trunk.bottom_left().meet_hv(fork_join),
-                fork_join.meet_vh(right_layout.trunk.top_left()),
-                right_layout.trunk.top_left(),
-            )
+        left_fork, right_fork, inner_fork = drawing.fork_paths(
+            layout, left_layout, right_layout
+        )
 
-        layers["background"].append(
-            rf"""\path[species background] ({
-                left_fork[0] : {MAX_DIGITS}
-            }) [rounded corners={{{params.species_border_rounding}}}] -- ({
-                left_fork[1] : {MAX_DIGITS}
-            }) -- ({
-                left_fork[2] : {MAX_DIGITS}
-            }) [sharp corners] -- ({
-                left_fork[3] : {MAX_DIGITS}
-            }) -- ({
-                right_fork[3] : {MAX_DIGITS}
-            }) [rounded corners={{{params.species_border_rounding}}}] -- ({
-                right_fork[2] : {MAX_DIGITS}
-            }) -- ({
-                right_fork[1] : {MAX_DIGITS}
-            }) [sharp corners] -- ({
-                right_fork[0] : {MAX_DIGITS}
-            }) -- ({
-                inner_fork[3] : {MAX_DIGITS}
-            }) [rounded corners={{{params.species_border_rounding}}}] -- ({
-                inner_fork[2] : {MAX_DIGITS}
-            }) -- ({
-                inner_fork[1] : {MAX_DIGITS}
-            }) [sharp corners] -- ({
-                inner_fork[0] : {MAX_DIGITS}
-            }) -- cycle;"""
+        layers.background(
+            _FORK_TEMPLATE.format(
+                left=left_fork,
+                right=right_fork,
+                inner=inner_fork,
+                rounding=params.species_border_rounding,
+            )
         )
     else:
         # Draw leaf
-        if params.orientation == Orientation.VERTICAL:
-            leaf_shift = Position(0, params.species_leaf_spacing)
-            path = (
-                layout.trunk.top_left(),
-                layout.trunk.bottom_left() + leaf_shift,
-                layout.trunk.bottom_right() + leaf_shift,
-                layout.trunk.top_right(),
-            )
-        else:
-            leaf_shift = Position(params.species_leaf_spacing, 0)
-            path = (
-                layout.trunk.top_left(),
-                layout.trunk.top_right() + leaf_shift,
-                layout.trunk.bottom_right() + leaf_shift,
-                layout.trunk.bottom_left(),
+        path = drawing.leaf_path(layout, params)
+        layers.background(
+            _LEAF_TEMPLATE.format(
+                path=path,
+                name=_species_label(species_node.name, params.species_label_width),
+                rounding=params.species_border_rounding,
             )
-
-        species_name = tex.escape(species_node.name)
-
-        if params.species_label_width is not None:
-            species_name = balanced_wrap(
-                species_name, params.species_label_width
-            ).replace("\n", "\\\\")
-
-        layers["background"].append(
-            r"\path[species background, "
-            rf"""rounded corners={{{params.species_border_rounding}}}] ({
-                path[0] : {MAX_DIGITS}
-            }) -- ({
-                path[1] : {MAX_DIGITS}
-            }) -- node[species label] {{{
-                species_name
-            }}} ({
-                path[2] : {MAX_DIGITS}
-            }) -- ({
-                path[3] : {MAX_DIGITS}
-            });"""
         )
 
 
@@ -299,165 +548,177 @@ def _tikz_draw_branches(  # pylint:disable=too-many-locals,disable=too-many-argu
     layout: SubtreeLayout,
     left_layout: Optional[SubtreeLayout],
     right_layout: Optional[SubtreeLayout],
-    all_layouts: Layout,
-    mapping: TreeMapping,
-    layers: Dict[str, List[str]],
+    layers: _Layers,
     get_color: Callable[str, str],
+    drawing: _Drawing,
     params: DrawParams,
 ) -> None:
     """Draw the interior branches of a species subtree."""
-    if params.orientation == Orientation.VERTICAL:
-        fork_links = ("|-", "-|")
-    else:
-        fork_links = ("-|", "|-")
-
-    for root_gene, branch in layout.branches.items():
-        branch_pos = branch.rect.center()
+    fork_links = drawing.fork_links
+    write_branch = layers.gene_branches
+    write_transfer = layers.gene_transfers
+    write_event = layers.events
+    branches = layout.branches
+    get_anchor = layout.anchors.get
+
+    for root_gene, branch in branches.items():
+        kind = branch.kind
+        anchor_parent = branch.anchor_parent
         left_gene = branch.left
         right_gene = branch.right
-
-        if root_gene in layout.anchors:
-            layers["gene branches"].append(
-                rf"""\path[branch={{{get_color(branch.color)}}}] ({
-                    branch.anchor_parent : {MAX_DIGITS}
-                }) -- ({
-                    layout.anchors[root_gene] : {MAX_DIGITS}
-                });"""
+        color = get_color(branch.color)
+        anchor = get_anchor(root_gene)
+
+        if anchor is not None:
+            write_branch(
+                _BRANCH_TEMPLATE.format(
+                    color=color,
+                    start=anchor_parent,
+                    link=_STRAIGHT,
+                    end=anchor,
+                )
             )
 
-        if branch.kind == NodeEvent.LEAF:
-            if params.orientation == Orientation.VERTICAL:
-                leaf_pos = branch.rect.top() + Position(
-                    0, params.extant_gene_diameter / 2
+        if kind is _LEAF:
+            write_event(
+                _EXTANT_GENE_TEMPLATE.format(
+                    color=color,
+                    name=branch.name,
+                    pos=drawing.extant_gene_pos(branch, params),
                 )
-            else:
-                leaf_pos = branch.rect.left() + Position(
-                    params.extant_gene_diameter / 2, 0
-                )
-
-            layers["events"].append(
-                rf"""\node[extant gene={{{
-                    get_color(branch.color)
-                }}}{{{branch.name}}}] at ({leaf_pos : {MAX_DIGITS}}) {{}};"""
             )
-        elif branch.kind == EdgeEvent.FULL_LOSS:
+        elif kind is _FULL_LOSS:
+            # Loss branches are anchored to their parent at their center
+            branch_pos = anchor_parent
+
             if right_gene is None:
                 assert left_layout is not None
                 keep_pos = left_layout.anchors[left_gene]
-
-                if params.orientation == Orientation.VERTICAL:
-                    loss_pos = Position(layout.trunk.right().x, branch_pos.y)
-                else:
-                    loss_pos = Position(branch_pos.x, layout.trunk.bottom().y)
             else:
                 assert right_layout is not None
                 keep_pos = right_layout.anchors[right_gene]
 
-                if params.orientation == Orientation.VERTICAL:
-                    loss_pos = Position(layout.trunk.left().x, branch_pos.y)
-                else:
-                    loss_pos = Position(branch_pos.x, layout.trunk.top().y)
-
-            layers["gene branches"].append(
-                rf"""\path[branch={{{
-                    get_color(branch.color)
-                }}}] ({branch_pos : {MAX_DIGITS}}) -- ({
-                    loss_pos : {MAX_DIGITS}
-                });"""
-            )
-            layers["events"].append(
-                rf"""\node[loss={{{
-                    get_color(branch.color)
-                }}}] at ({loss_pos : {MAX_DIGITS}}) {{}};"""
+            loss_pos = drawing.loss_pos(layout, branch_pos, left_gene is None)
+            write_branch(
+                _BRANCH_TEMPLATE.format(
+                    color=color,
+                    start=branch_pos,
+                    link=_STRAIGHT,
+                    end=loss_pos,
+                )
             )
-            layers["gene branches"].append(
-                rf"""\path[branch={{{
-                    get_color(branch.color)
-                }}}] ({branch_pos : {MAX_DIGITS}}) {fork_links[1]} ({
-                    keep_pos : {MAX_DIGITS}
-                });"""
+            write_event(_LOSS_TEMPLATE.format(color=color, pos=loss_pos))
+            write_branch(
+                _BRANCH_TEMPLATE.format(
+                    color=color,
+                    start=branch_pos,
+                    link=fork_links[1],
+                    end=keep_pos,
+                )
             )
-        elif branch.kind == NodeEvent.SPECIATION:
+        elif kind is _SPECIATION:
             assert left_layout is not None
             assert right_layout is not None
-            layers["gene branches"].append(
-                rf"""\path[branch={{{get_color(branch.color)}}}] ({
-                    left_layout.anchors[left_gene] : {MAX_DIGITS}
-                }) {fork_links[0]} ({
-                    branch.anchor_left : {MAX_DIGITS}
-                }) ({
-                    branch.anchor_right : {MAX_DIGITS}
-                }) {fork_links[1]} ({
-                    right_layout.anchors[right_gene] : {MAX_DIGITS}
-                });"""
+            write_branch(
+                _FORK_BRANCH_TEMPLATE.format(
+                    color=color,
+                    left=left_layout.anchors[left_gene],
+                    left_anchor=branch.anchor_left,
+                    right_anchor=branch.anchor_right,
+                    right=right_layout.anchors[right_gene],
+                    links=fork_links,
+                )
+            )
+            write_event(
+                _EVENT_TEMPLATE.format(
+                    style="speciation",
+                    color=color,
+                    pos=branch.rect.center(),
+                    name=branch.name,
+                )
             )
-            layers["events"].append(
-                rf"""\node[speciation={{{get_color(branch.color)}}}] at ({
-                    branch_pos : {MAX_DIGITS}
-                }) {{{branch.name}}};"""
+        elif kind is _DUPLICATION:
+            write_branch(
+                _FORK_BRANCH_TEMPLATE.format(
+                    color=color,
+                    left=branches[left_gene].anchor_parent,
+                    left_anchor=branch.anchor_left,
+                    right_anchor=branch.anchor_right,
+                    right=branches[right_gene].anchor_parent,
+                    links=fork_links,
+                )
             )
-        elif branch.kind == NodeEvent.DUPLICATION:
-            layers["gene branches"].append(
-                rf"""\path[branch={{{get_color(branch.color)}}}] ({
-                    layout.branches[left_gene].anchor_parent : {MAX_DIGITS}
-                }) {fork_links[0]} ({
-                    branch.anchor_left : {MAX_DIGITS}
-                }) ({
-                    branch.anchor_right : {MAX_DIGITS}
-                }) {fork_links[1]} ({
-                    layout.branches[right_gene].anchor_parent : {MAX_DIGITS}
-                });"""
+            write_event(
+                _EVENT_TEMPLATE.format(
+                    style="duplication",
+                    color=color,
+                    pos=branch.rect.center(),
+                    name=branch.name,
+                )
             )
-            layers["events"].append(
-                rf"""\node[duplication={{{get_color(branch.color)}}}] at ({
-                    branch_pos : {MAX_DIGITS}
-                }) {{{branch.name}}};"""
+        elif kind is _TRANSFER:
+            branch_pos = branch.rect.center()
+            anchor_out, bend_out = drawing.transfer_out(
+                branch, branch_pos, branch.anchor_foreign
             )
-        elif branch.kind == NodeEvent.HORIZONTAL_TRANSFER:
-            foreign_layout = all_layouts[mapping[right_gene]]
-            foreign_pos = foreign_layout.anchors[right_gene]
-
-            if params.orientation == Orientation.VERTICAL:
-                if branch_pos.x < foreign_pos.x:
-                    bend_out = "out=0, in=180"
-                    anchor_out = branch.anchor_right
-                else:
-                    bend_out = "out=180, in=0"
-                    anchor_out = branch.anchor_left
-            else:
-                if branch_pos.y > foreign_pos.y:
-                    anchor_out = branch.anchor_left
-                    bend_out = "out=90, in=-90"
-                else:
-                    anchor_out = branch.anchor_right
-                    bend_out = "out=-90, in=90"
-
-            layers["gene branches"].append(
-                rf"""\path[branch={{{get_color(branch.color)}}}] ({
-                    layout.branches[left_gene].anchor_parent : {MAX_DIGITS}
-                }) |- ({
-                    branch.anchor_child : {MAX_DIGITS}
-                });"""
+
+            write_branch(
+                _BRANCH_TEMPLATE.format(
+                    color=color,
+                    start=branches[left_gene].anchor_parent,
+                    link=_VERTICAL_FIRST,
+                    end=branch.anchor_child,
+                )
             )
-            layers["gene transfers"].append(
-                rf"""\path[transfer branch={{{get_color(branch.color)}}}] ({
-                    anchor_out : {MAX_DIGITS}
-                }) to[{bend_out}] ({
-                    foreign_pos : {MAX_DIGITS}
-                });"""
+            write_transfer(
+                _TRANSFER_TEMPLATE.format(
+                    color=color,
+                    start=anchor_out,
+                    bend=bend_out,
+                    end=branch.anchor_foreign,
+                )
             )
             # Force content for empty nodes to workaround
             # rendering bug with TikZ chamfered rectangles
-            name = branch.name or r"\phantom{-}"
-            layers["events"].append(
-                rf"""\node[horizontal gene transfer={{{
-                    get_color(branch.color)
-                }}}] at ({branch_pos : {MAX_DIGITS}}) {{{name}}};"""
+            write_event(
+                _EVENT_TEMPLATE.format(
+                    style="horizontal gene transfer",
+                    color=color,
+                    pos=branch_pos,
+                    name=branch.name or r"\phantom{-}",
+                )
             )
         else:
             raise ValueError("Invalid node type")
 
 
+_RenderRow = Tuple[
+    TreeNode, SubtreeLayout, Optional[SubtreeLayout], Optional[SubtreeLayout]
+]
+
+
+def _render_table(rec: ReconciliationOutput, layout: Layout) -> List[_RenderRow]:
+    """
+    List the species in drawing order, each with its layout and
+    the layouts of its children (None for leaves).
+    """
+    table = []
+
+    for species_node in rec.input.species_lca.preorder:
+        children = species_node.children
+
+        if children:
+            left, right = children
+            left_layout = layout[left]
+            right_layout = layout[right]
+        else:
+            left_layout = right_layout = None
+
+        table.append((species_node, layout[species_node], left_layout, right_layout))
+
+    return table
+
+
 def render(
     rec: ReconciliationOutput,
     layout: Layout,
@@ -492,60 +753,60 @@ def render(
     :param params: rendering parameters
     :returns: generated TikZ code
     """
-    layers: Dict[str, List[str]] = {
-        "background": [],
-        "gene branches": [],
-        "gene transfers": [],
-        "events": [],
-    }
-    colors: List[str] = []
+    table = _render_table(rec, layout)
+    drawing = _DRAWINGS[params.orientation]
+
+    # Name each color in order of first use
     color_prefix = "reccolor"
+    colors: Dict[str, str] = {}
 
-    def get_color(html: str) -> str:
-        if html in colors:
-            return f"{color_prefix}{colors.index(html)}"
+    for _, node_layout, _, _ in table:
+        for branch in node_layout.branches.values():
+            if branch.color not in colors:
+                colors[branch.color] = f"{color_prefix}{len(colors)}"
 
-        colors.append(html)
-        return f"{color_prefix}{len(colors) - 1}"
+    # Now that colors are known, the document header and the first layer
+    # can be written straight into the output, and only the other layers
+    # need to be held back until the end
+    result = io.StringIO()
+    result.write(get_tikz_definitions(params))
+    result.write("\n")
 
-    for species_node in rec.input.species_lca.tree.traverse("preorder"):
-        node_layout = layout[species_node]
+    for html, name in colors.items():
+        result.write(_COLOR_TEMPLATE.format(name=name, html=html))
 
-        if species_node.is_leaf():
-            left_layout = None
-            right_layout = None
-        else:
-            left, right = species_node.children
-            left_layout = layout[left]
-            right_layout = layout[right]
+    result.write(r"\begin{tikzpicture}" "\n")
+    result.write(f"% {_LAYERS[0]}\n")
+
+    # Held back layers only collect references to their chunks, which are
+    # then copied once into the output instead of through another buffer
+    buffers: Dict[str, List[str]] = {name: [] for name in _LAYERS[1:]}
+    layers = _Layers(result.write, *(buffer.append for buffer in buffers.values()))
+    get_color = colors.__getitem__
 
+    for species_node, node_layout, left_layout, right_layout in table:
         _tikz_draw_fork(
-            species_node, node_layout, left_layout, right_layout, layers, params
+            species_node,
+            node_layout,
+            left_layout,
+            right_layout,
+            layers,
+            drawing,
+            params,
         )
         _tikz_draw_branches(
             node_layout,
             left_layout,
             right_layout,
-            layout,
-            rec.object_species,
             layers,
             get_color,
+            drawing,
             params,
         )
 
-    result = [get_tikz_definitions(params)]
-
-    # Define colors used in the rendering
-    for i, html in enumerate(colors):
-        result.append(rf"\definecolor{{{color_prefix}{i}}}{{HTML}}{{{html}}}")
-
-    # Append layers in order
-    result.append(r"\begin{tikzpicture}")
-
-    for name, layer in layers.items():
-        result.append(f"% {name}")
-        result.extend(layer)
+    for name, layer in buffers.items():
+        result.write(f"% {name}\n")
+        result.writelines(layer)
 
-    result.append(r"\end{tikzpicture}")
-    result.append("")
-    return "\n".join(result)
+    result.write(r"\end{tikzpicture}" "\n")
+    return result.getvalue()
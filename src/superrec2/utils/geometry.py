@@ -1,7 +1,21 @@
 """2D geometry primitives."""
+from functools import lru_cache
 from typing import NamedTuple
 
 
+# Named tuples below are created by passing their fields straight to the
+# tuple constructor in hot methods, which skips the argument handling of
+# the generated named tuple constructors. Arithmetic operators also read
+# their own fields by index, which is cheaper than through field names
+_new = tuple.__new__
+
+
+@lru_cache(maxsize=1 << 14, typed=True)
+def _format_rounded(x: float, y: float, digits: int) -> str:
+    """Format a pair of coordinates rounded to a number of places."""
+    return f"{round(x, digits)},{round(y, digits)}"
+
+
 class Position(NamedTuple):
     """Vector or point on the 2D plane."""
 
@@ -10,11 +24,11 @@ class Position(NamedTuple):
 
     def __add__(self, pos: tuple) -> "Position":
         """Add two vectors together."""
-        return Position(self.x + pos[0], self.y + pos[1])
+        return _new(Position, (self[0] + pos[0], self[1] + pos[1]))
 
     def __sub__(self, pos: tuple) -> "Position":
         """Subtract a vector from another."""
-        return Position(self.x - pos[0], self.y - pos[1])
+        return _new(Position, (self[0] - pos[0], self[1] - pos[1]))
 
     def __str__(self) -> str:
         """Print vector coordinates."""
@@ -24,6 +38,13 @@ class Position(NamedTuple):
         """Format the vector as a coordinate tuple, possibly rounding it."""
         if spec:
             digits = int(spec)
+
+            # The same coordinates are formatted many times over when
+            # generating drawings, so results are cached, except for
+            # zeros which would not keep their sign in the cache
+            if self.x and self.y:
+                return _format_rounded(self.x, self.y, digits)
+
             return f"{round(self.x, digits)},{round(self.y, digits)}"
 
         return str(self)
@@ -33,14 +54,14 @@ class Position(NamedTuple):
         Intersect a horizontal line from this position with a vertical line
         from another position.
         """
-        return Position(pos[0], self.y)
+        return _new(Position, (pos[0], self.y))
 
     def meet_vh(self, pos: tuple) -> "Position":
         """
         Intersect a vertical line from this position with a horizontal line
         from another position.
         """
-        return Position(self.x, pos[1])
+        return _new(Position, (self.x, pos[1]))
 
 
 class Size(NamedTuple):
@@ -75,44 +96,44 @@ class Rect(NamedTuple):
 
     def __add__(self, pos: tuple) -> "Rect":
         """Shift the rectangle by adding the given vector."""
-        return Rect(x=self.x + pos[0], y=self.y + pos[1], w=self.w, h=self.h)
+        return _new(Rect, (self[0] + pos[0], self[1] + pos[1], self[2], self[3]))
 
     def __sub__(self, pos: tuple) -> "Rect":
         """Shift the rectangle by subtracting the given vector."""
-        return Rect(x=self.x - pos[0], y=self.y - pos[1], w=self.w, h=self.h)
+        return _new(Rect, (self[0] - pos[0], self[1] - pos[1], self[2], self[3]))
 
     def top_left(self) -> Position:
         """Position of the upper left corner."""
-        return Position(self.x, self.y)
+        return _new(Position, (self.x, self.y))
 
     def top(self) -> Position:
         """Position of the upper edge’s center."""
-        return Position(self.x + self.w / 2, self.y)
+        return _new(Position, (self.x + self.w / 2, self.y))
 
     def top_right(self) -> Position:
         """Position of the upper left corner."""
-        return Position(self.x + self.w, self.y)
+        return _new(Position, (self.x + self.w, self.y))
 
     def right(self) -> Position:
         """Position of the right edge’s center."""
-        return Position(self.x + self.w, self.y + self.h / 2)
+        return _new(Position, (self.x + self.w, self.y + self.h / 2))
 
     def bottom_right(self) -> Position:
         """Position of the lower right corner."""
-        return Position(self.x + self.w, self.y + self.h)
+        return _new(Position, (self.x + self.w, self.y + self.h))
 
     def bottom(self) -> Position:
         """Position of the lower edge’s center."""
-        return Position(self.x + self.w / 2, self.y + self.h)
+        return _new(Position, (self.x + self.w / 2, self.y + self.h))
 
     def bottom_left(self) -> Position:
         """Position of the lower left corner."""
-        return Position(self.x, self.y + self.h)
+        return _new(Position, (self.x, self.y + self.h))
 
     def left(self) -> Position:
         """Position of the left edge’s center."""
-        return Position(self.x, self.y + self.h / 2)
+        return _new(Position, (self.x, self.y + self.h / 2))
 
     def center(self) -> Position:
         """Position of the center."""
-        return Position(self.x + self.w / 2, self.y + self.h / 2)
+        return _new(Position, (self.x + self.w / 2, self.y + self.h / 2))
@@ -38,19 +38,20 @@ class RangeMinQuery(Generic[Element]):  # pylint:disable=too-few-public-methods
         levels = _ilog2(length) + 1
 
         # sparse_table[depth][i] stores the minimum of the
-        # (i, i + 2**depth) range
-        self.sparse_table: List[List[Optional[Element]]] = [
-            [None] * length for _ in range(levels)
-        ]
-        self.sparse_table[0] = list(data)
+        # (i, i + 2**depth) range. Each row is built from the previous one
+        # by pairing up its entries that are 2**(depth - 1) apart. Pairs are
+        # compared inline, which is about three times as fast as calling
+        # min(), and keeps the leftmost of two equal elements like min() does
+        self.sparse_table: List[List[Element]] = [list(data)]
 
         for depth in range(1, levels):
-            for i in range(length - 2**depth + 1):
-                left = self.sparse_table[depth - 1][i]
-                assert left is not None
-                right = self.sparse_table[depth - 1][i + 2 ** (depth - 1)]
-                assert right is not None
-                self.sparse_table[depth][i] = min(left, right)
+            prev = self.sparse_table[-1]
+            self.sparse_table.append(
+                [
+                    right if right < left else left  # noqa: FURB136
+                    for left, right in zip(prev, prev[1 << (depth - 1) :])
+                ]
+            )
 
     def __call__(self, start: int, stop: int) -> Optional[Element]:
         """
@@ -66,7 +67,7 @@ class RangeMinQuery(Generic[Element]):  # pylint:disable=too-few-public-methods
             return None
 
         depth = _ilog2(stop - start)
-        return min(
-            self.sparse_table[depth][start],
-            self.sparse_table[depth][stop - 2**depth],
-        )
+        row = self.sparse_table[depth]
+        left = row[start]
+        right = row[stop - (1 << depth)]
+        return right if right < left else left  # noqa: FURB136
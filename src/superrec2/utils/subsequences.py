@@ -74,6 +74,12 @@ def subseq_segment_dist(
     """
     Count the number of lost segments between two subsequences.
 
+    The count is computed with whole-mask arithmetic instead of walking
+    both masks bit by bit. Bits that are not set in :param:`parent` are
+    gaps, which a lost segment carries over. A lost segment starts at each
+    lost element whose closest preceding element of :param:`parent` is
+    kept, or which has no preceding element.
+
     :param child: subsequence bitmask
     :param parent: parent subsequence bitmask
     :param edges: if True, count lost sequences on the edges of
@@ -81,31 +87,23 @@ def subseq_segment_dist(
     :returns: number of lost segments from :param:`parent` to :param:`child`,
         or -1 if :param:`child` is not a subsequence of :param:`parent`
     """
-    in_segm = not edges
-    dist = 0
-
-    if parent.bit_length() < child.bit_length():
+    if child & ~parent:
         return -1
 
-    for _ in range(parent.bit_length()):
-        bit_child = child & 1
-        bit_parent = parent & 1
+    lost = parent & ~child
+    gaps = ((1 << parent.bit_length()) - 1) & ~parent
 
-        if bit_child and not bit_parent:
-            return -1
+    # Positions right after a kept element or at the start of the sequence,
+    # and positions right after a run of gaps that begins at one of those
+    after_kept = (child << 1) | 1
+    after_gaps = (gaps + (after_kept & gaps)) & ~gaps
+    dist = (lost & ((after_kept & ~gaps) | after_gaps)).bit_count()
 
-        if bit_parent:
-            if not bit_child:
-                if not in_segm:
-                    dist += 1
-                    in_segm = True
-            elif in_segm:
-                in_segm = False
-
-        child >>= 1
-        parent >>= 1
+    if not edges:
+        if lost & -parent:
+            dist -= 1
 
-    if in_segm and not edges:
-        dist -= 1
+        if not parent or lost >> (parent.bit_length() - 1):
+            dist -= 1
 
     return dist
@@ -1,8 +1,10 @@
 """Bridge with the XeLaTeX compiler."""
 import os
+import re
 import subprocess
 import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Iterable, IO, List, NamedTuple
 from .geometry import Size
 
@@ -126,26 +128,24 @@ def escape(text: str) -> str:
     return text.replace("\\", "\\\\").replace(r"_", r"\_")
 
 
-def measure(texts: Iterable[str], preamble="") -> List[MeasureBox]:
-    """
-    Measure dimensions of TeX boxes.
+# Lines printed by the TeX compiler for each measured box, which are all
+# picked out of the compiler output in a single scan
+_MEASURE_LINE = re.compile(r"^\$\$\$([^,]*)pt,([^,]*)pt,([^,]*?)pt\r?$", re.MULTILINE)
 
-    :param texts: list of text strings to measure
-    :param preamble: modules to load and macro definitions
-    :raises TeXError: if a TeX error occurs
-    :returns: list of measurements for each input string
-    """
-    src = (
+
+def _measure_run(texts: Iterable[str], preamble: str) -> List[MeasureBox]:
+    """Measure dimensions of TeX boxes in a single TeX run."""
+    src = [
         r"\documentclass{standalone}"
         "\n" + preamble + "\n"
         r"\newsavebox{\measurebox}"
         "\n"
         r"\scrollmode"
         "\n"
-    )
+    ]
 
     for text in texts:
-        src += (
+        src.append(
             rf"\savebox{{\measurebox}}{{{text}}}"
             "\n"
             r"\typeout{$$$"
@@ -153,20 +153,34 @@ def measure(texts: Iterable[str], preamble="") -> List[MeasureBox]:
             "\n"
         )
 
-    src += r"\scrollmode" "\n" r"\begin{document}\end{document}" "\n"
+    src.append(r"\scrollmode" "\n" r"\begin{document}\end{document}" "\n")
+
+    out = tex_compile("".join(src))
+    return [
+        MeasureBox(float(width), float(height), float(depth))
+        for width, height, depth in _MEASURE_LINE.findall(out)
+    ]
+
+
+def measure(texts: Iterable[str], preamble="", jobs: int = 1) -> List[MeasureBox]:
+    """
+    Measure dimensions of TeX boxes.
+
+    :param texts: list of text strings to measure
+    :param preamble: modules to load and macro definitions
+    :param jobs: maximum number of TeX runs to start in parallel, each
+        measuring a contiguous share of the input strings
+    :raises TeXError: if a TeX error occurs
+    :returns: list of measurements for each input string
+    """
+    texts = list(texts)
 
-    out = tex_compile(src)
-    boxes = []
+    if jobs <= 1 or len(texts) <= 1:
+        return _measure_run(texts, preamble)
 
-    for line in out.splitlines():
-        if line.startswith("$$$"):
-            boxes.append(
-                MeasureBox(
-                    *map(
-                        lambda value: float(value.removesuffix("pt")),
-                        line[3:].split(","),
-                    )
-                )
-            )
+    share = -(-len(texts) // jobs)
+    chunks = [texts[i : i + share] for i in range(0, len(texts), share)]
 
-    return boxes
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        results = executor.map(lambda chunk: _measure_run(chunk, preamble), chunks)
+        return [box for result in results for box in result]
@@ -31,11 +31,19 @@ def balanced_wrap(text: str, width: int) -> str:
     best_result = textwrap.wrap(text, width, break_long_words=False)
     best_badness = _wrap_badness(best_result)
     line_count = len(best_result)
+    next_result = best_result
 
     # Reduce wrap width looking for the most balanced solution
-    # while keeping the same number of lines (naive algorithm)
-    while width > 1:
-        width -= 1
+    # while keeping the same number of lines
+    while True:
+        # Wrapping greedily to any width between the longest line of the
+        # last solution and the width that produced it gives that same
+        # solution again, so those widths can be skipped
+        width = min(width, max(len(line) for line in next_result)) - 1
+
+        if width < 1:
+            break
+
         next_result = textwrap.wrap(text, width, break_long_words=False)
 
         if len(next_result) != line_count:
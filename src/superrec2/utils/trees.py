@@ -12,18 +12,30 @@ def _euler_tour(root: TreeNode, level: int = 0) -> List[Tuple[int, TreeNode]]:
 
     See <https://en.wikipedia.org/wiki/Euler_tour_technique>.
 
+    The tour is built in a single list using an explicit stack, so that
+    deep trees neither copy partial tours at each level nor hit the
+    interpreter recursion limit.
+
     :param root: root node of the tree
-    :param level: current level (used for recursive calls)
+    :param level: level of the root node
     :returns: Euler tour representation
     """
-    if root.is_leaf():
-        return [(level, root)]
-
     tour = [(level, root)]
+    stack = [(root, level, iter(root.children))]
+
+    while stack:
+        _, node_level, children = stack[-1]
+        child = next(children, None)
 
-    for child in root.children:
-        tour.extend(_euler_tour(child, level + 1))
-        tour.append((level, root))
+        if child is None:
+            stack.pop()
+
+            if stack:
+                parent, parent_level, _ = stack[-1]
+                tour.append((parent_level, parent))
+        else:
+            tour.append((node_level + 1, child))
+            stack.append((child, node_level + 1, iter(child.children)))
 
     return tour
 
@@ -49,10 +61,21 @@ class LowestCommonAncestor:
         self.traversal = _euler_tour(tree)
         self.range_min_query = RangeMinQuery(self.traversal)
         self.traversal_index: Dict[TreeNode, int] = {}
+        self.traversal_end: Dict[TreeNode, int] = {}
+        self.levels: Dict[TreeNode, int] = {}
+        preorder = []
 
-        for i, (_, node) in enumerate(self.traversal):
+        for i, (level, node) in enumerate(self.traversal):
             if node not in self.traversal_index:
                 self.traversal_index[node] = i
+                self.levels[node] = level
+                preorder.append(node)
+
+            self.traversal_end[node] = i
+
+        # Nodes are first reached by the Euler tour in preorder, which
+        # saves walking the tree again each time this order is needed
+        self.preorder: Tuple[TreeNode, ...] = tuple(preorder)
 
     def __call__(self, *nodes: TreeNode) -> TreeNode:
         """
@@ -82,6 +105,9 @@ class LowestCommonAncestor:
         """
         Check whether a node is an ancestor of another.
 
+        The subtree rooted at a node spans a contiguous interval of the
+        Euler tour, so this only compares traversal indices.
+
         Complexity: O(1).
 
         :param first: ancestor node
@@ -89,7 +115,11 @@ class LowestCommonAncestor:
         :returns: True if and only if `second` is on the path from the tree
             root to `first` (i.e., `first` is an ancestor of `second`)
         """
-        return self(first, second) == first
+        return (
+            self.traversal_index[first]
+            <= self.traversal_index[second]
+            <= self.traversal_end[first]
+        )
 
     def is_strict_ancestor_of(self, first: TreeNode, second: TreeNode) -> bool:
         """
@@ -103,7 +133,7 @@ class LowestCommonAncestor:
         :returns: True if and only if `second` is on the path from the tree
             root to `first` (i.e., `first` is an ancestor of `second`)
         """
-        return self(first, second) == first and first != second
+        return first != second and self.is_ancestor_of(first, second)
 
     def is_comparable(self, first: TreeNode, second: TreeNode) -> bool:
         """
@@ -117,10 +147,11 @@ class LowestCommonAncestor:
             or descendant of `second` (i.e., `first` and `second` are
             comparable)
         """
-        return self.is_ancestor_of(
-            first, second
-        ) or self.is_ancestor_of(  # pylint:disable=arguments-out-of-order
-            second, first
+        first_index = self.traversal_index[first]
+        second_index = self.traversal_index[second]
+        return (
+            first_index <= second_index <= self.traversal_end[first]
+            or second_index <= first_index <= self.traversal_end[second]
         )
 
     def level(self, node: TreeNode) -> int:
@@ -129,7 +160,7 @@ class LowestCommonAncestor:
 
         Complexity: O(1).
         """
-        return self.traversal[self.traversal_index[node]][0]
+        return self.levels[node]
 
     def distance(self, first: TreeNode, second: TreeNode) -> int:
         """
@@ -137,8 +168,18 @@ class LowestCommonAncestor:
 
         Complexity: O(1).
         """
+        # The range-minimum query already gives the level of the common
+        # ancestor, so there is no need to look the ancestor up again
+        first_index = self.traversal_index[first]
+        second_index = self.traversal_index[second]
+        result = self.range_min_query(
+            min(first_index, second_index), max(first_index, second_index) + 1
+        )
+        assert result is not None
         return (
-            self.level(first) + self.level(second) - 2 * self.level(self(first, second))
+            self.traversal[first_index][0]
+            + self.traversal[second_index][0]
+            - 2 * result[0]
         )
 
 
@@ -374,6 +415,25 @@ def is_binary(tree: Tree) -> bool:
     )
 
 
+def nodes_by_name(tree: Tree) -> Dict[str, TreeNode]:
+    """
+    Index the nodes of a tree by name.
+
+    This is useful for resolving many names at once, since each `tree & name`
+    lookup searches through the whole tree. When several nodes share the
+    same name, the one that `tree & name` would return is kept.
+
+    :param tree: labeled tree
+    :returns: mapping of node names to nodes
+    """
+    result: Dict[str, TreeNode] = {}
+
+    for node in tree.traverse():
+        result.setdefault(node.name, node)
+
+    return result
+
+
 def graft(
     tree: Tree, leaf: Tree, ignore: Optional[Set[int]] = None
 ) -> Generator[Tree, None, None]:
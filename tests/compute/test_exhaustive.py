@@ -1,6 +1,6 @@
 from ete3 import Tree
 from superrec2.utils.dynamic_programming import RetentionPolicy
-from superrec2.utils.trees import LowestCommonAncestor
+from superrec2.utils.trees import LowestCommonAncestor, nodes_by_name
 from superrec2.model.tree_mapping import get_species_mapping
 from superrec2.model.reconciliation import (
     ReconciliationInput,
@@ -11,7 +11,9 @@ from superrec2.compute.exhaustive import generate_all, reconcile_exhaustive
 
 
 gene_tree = Tree("((x_1,x_2)2,(y_1,z_1)3)1;", format=1)
+gene_nodes = nodes_by_name(gene_tree)
 species_tree = Tree("(X,(Y,Z)YZ)XYZ;", format=1)
+species_nodes = nodes_by_name(species_tree)
 leaf_gene_species = get_species_mapping(gene_tree, species_tree)
 
 species_lca = LowestCommonAncestor(species_tree)
@@ -32,9 +34,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "X",
-                gene_tree & "3": species_tree & "YZ",
-                gene_tree & "1": species_tree & "XYZ",
+                gene_nodes["2"]: species_nodes["X"],
+                gene_nodes["3"]: species_nodes["YZ"],
+                gene_nodes["1"]: species_nodes["XYZ"],
             },
         )
         in rec_outputs
@@ -45,9 +47,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "X",
-                gene_tree & "3": species_tree & "YZ",
-                gene_tree & "1": species_tree & "X",
+                gene_nodes["2"]: species_nodes["X"],
+                gene_nodes["3"]: species_nodes["YZ"],
+                gene_nodes["1"]: species_nodes["X"],
             },
         )
         in rec_outputs
@@ -58,9 +60,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "X",
-                gene_tree & "3": species_tree & "YZ",
-                gene_tree & "1": species_tree & "YZ",
+                gene_nodes["2"]: species_nodes["X"],
+                gene_nodes["3"]: species_nodes["YZ"],
+                gene_nodes["1"]: species_nodes["YZ"],
             },
         )
         in rec_outputs
@@ -71,9 +73,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "X",
-                gene_tree & "3": species_tree & "XYZ",
-                gene_tree & "1": species_tree & "XYZ",
+                gene_nodes["2"]: species_nodes["X"],
+                gene_nodes["3"]: species_nodes["XYZ"],
+                gene_nodes["1"]: species_nodes["XYZ"],
             },
         )
         in rec_outputs
@@ -84,9 +86,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "X",
-                gene_tree & "3": species_tree & "Y",
-                gene_tree & "1": species_tree & "YZ",
+                gene_nodes["2"]: species_nodes["X"],
+                gene_nodes["3"]: species_nodes["Y"],
+                gene_nodes["1"]: species_nodes["YZ"],
             },
         )
         in rec_outputs
@@ -97,9 +99,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "X",
-                gene_tree & "3": species_tree & "Y",
-                gene_tree & "1": species_tree & "XYZ",
+                gene_nodes["2"]: species_nodes["X"],
+                gene_nodes["3"]: species_nodes["Y"],
+                gene_nodes["1"]: species_nodes["XYZ"],
             },
         )
         in rec_outputs
@@ -110,9 +112,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "X",
-                gene_tree & "3": species_tree & "Y",
-                gene_tree & "1": species_tree & "X",
+                gene_nodes["2"]: species_nodes["X"],
+                gene_nodes["3"]: species_nodes["Y"],
+                gene_nodes["1"]: species_nodes["X"],
             },
         )
         in rec_outputs
@@ -123,9 +125,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "X",
-                gene_tree & "3": species_tree & "Y",
-                gene_tree & "1": species_tree & "Y",
+                gene_nodes["2"]: species_nodes["X"],
+                gene_nodes["3"]: species_nodes["Y"],
+                gene_nodes["1"]: species_nodes["Y"],
             },
         )
         in rec_outputs
@@ -136,9 +138,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "X",
-                gene_tree & "3": species_tree & "Z",
-                gene_tree & "1": species_tree & "YZ",
+                gene_nodes["2"]: species_nodes["X"],
+                gene_nodes["3"]: species_nodes["Z"],
+                gene_nodes["1"]: species_nodes["YZ"],
             },
         )
         in rec_outputs
@@ -149,9 +151,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "X",
-                gene_tree & "3": species_tree & "Z",
-                gene_tree & "1": species_tree & "XYZ",
+                gene_nodes["2"]: species_nodes["X"],
+                gene_nodes["3"]: species_nodes["Z"],
+                gene_nodes["1"]: species_nodes["XYZ"],
             },
         )
         in rec_outputs
@@ -162,9 +164,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "X",
-                gene_tree & "3": species_tree & "Z",
-                gene_tree & "1": species_tree & "X",
+                gene_nodes["2"]: species_nodes["X"],
+                gene_nodes["3"]: species_nodes["Z"],
+                gene_nodes["1"]: species_nodes["X"],
             },
         )
         in rec_outputs
@@ -175,9 +177,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "X",
-                gene_tree & "3": species_tree & "Z",
-                gene_tree & "1": species_tree & "Z",
+                gene_nodes["2"]: species_nodes["X"],
+                gene_nodes["3"]: species_nodes["Z"],
+                gene_nodes["1"]: species_nodes["Z"],
             },
         )
         in rec_outputs
@@ -188,9 +190,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "XYZ",
-                gene_tree & "3": species_tree & "YZ",
-                gene_tree & "1": species_tree & "XYZ",
+                gene_nodes["2"]: species_nodes["XYZ"],
+                gene_nodes["3"]: species_nodes["YZ"],
+                gene_nodes["1"]: species_nodes["XYZ"],
             },
         )
         in rec_outputs
@@ -201,9 +203,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "XYZ",
-                gene_tree & "3": species_tree & "XYZ",
-                gene_tree & "1": species_tree & "XYZ",
+                gene_nodes["2"]: species_nodes["XYZ"],
+                gene_nodes["3"]: species_nodes["XYZ"],
+                gene_nodes["1"]: species_nodes["XYZ"],
             },
         )
         in rec_outputs
@@ -214,9 +216,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "XYZ",
-                gene_tree & "3": species_tree & "Y",
-                gene_tree & "1": species_tree & "XYZ",
+                gene_nodes["2"]: species_nodes["XYZ"],
+                gene_nodes["3"]: species_nodes["Y"],
+                gene_nodes["1"]: species_nodes["XYZ"],
             },
         )
         in rec_outputs
@@ -227,9 +229,9 @@ def test_generate_all():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "2": species_tree & "XYZ",
-                gene_tree & "3": species_tree & "Z",
-                gene_tree & "1": species_tree & "XYZ",
+                gene_nodes["2"]: species_nodes["XYZ"],
+                gene_nodes["3"]: species_nodes["Z"],
+                gene_nodes["1"]: species_nodes["XYZ"],
             },
         )
         in rec_outputs
@@ -1,6 +1,6 @@
 from infinity import inf
 from ete3 import Tree
-from superrec2.utils.trees import LowestCommonAncestor
+from superrec2.utils.trees import LowestCommonAncestor, nodes_by_name
 from superrec2.utils.dynamic_programming import RetentionPolicy
 from superrec2.model.tree_mapping import get_species_mapping
 from superrec2.model.reconciliation import (
@@ -20,6 +20,8 @@ gene_tree = Tree(
 
 species_tree = Tree("(X,(Y,Z)YZ)XYZ;", format=1)
 species_lca = LowestCommonAncestor(species_tree)
+gene_nodes = nodes_by_name(gene_tree)
+species_nodes = nodes_by_name(species_tree)
 leaf_gene_species = get_species_mapping(gene_tree, species_tree)
 
 rec_input = ReconciliationInput(
@@ -45,11 +47,11 @@ def test_reconcile_lca():
     # Check that the expected result is returned
     assert result.object_species == {
         **leaf_gene_species,
-        gene_tree & "1": species_tree & "XYZ",
-        gene_tree & "2": species_tree & "YZ",
-        gene_tree & "3": species_tree & "XYZ",
-        gene_tree & "4": species_tree & "XYZ",
-        gene_tree & "5": species_tree & "YZ",
+        gene_nodes["1"]: species_nodes["XYZ"],
+        gene_nodes["2"]: species_nodes["YZ"],
+        gene_nodes["3"]: species_nodes["XYZ"],
+        gene_nodes["4"]: species_nodes["XYZ"],
+        gene_nodes["5"]: species_nodes["YZ"],
     }
 
     assert result.cost() == 4
@@ -82,11 +84,11 @@ def test_reconcile_thl():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "1": species_tree & "XYZ",
-                gene_tree & "2": species_tree & "YZ",
-                gene_tree & "3": species_tree & "X",
-                gene_tree & "4": species_tree & "X",
-                gene_tree & "5": species_tree & "YZ",
+                gene_nodes["1"]: species_nodes["XYZ"],
+                gene_nodes["2"]: species_nodes["YZ"],
+                gene_nodes["3"]: species_nodes["X"],
+                gene_nodes["4"]: species_nodes["X"],
+                gene_nodes["5"]: species_nodes["YZ"],
             },
         )
         in results
@@ -97,11 +99,11 @@ def test_reconcile_thl():
             rec_input,
             {
                 **leaf_gene_species,
-                gene_tree & "1": species_tree & "XYZ",
-                gene_tree & "2": species_tree & "YZ",
-                gene_tree & "3": species_tree & "X",
-                gene_tree & "4": species_tree & "YZ",
-                gene_tree & "5": species_tree & "YZ",
+                gene_nodes["1"]: species_nodes["XYZ"],
+                gene_nodes["2"]: species_nodes["YZ"],
+                gene_nodes["3"]: species_nodes["X"],
+                gene_nodes["4"]: species_nodes["YZ"],
+                gene_nodes["5"]: species_nodes["YZ"],
             },
         )
         in results
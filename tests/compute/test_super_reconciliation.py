@@ -5,7 +5,7 @@ from superrec2.model.reconciliation import (
     SuperReconciliationOutput,
     get_default_cost,
 )
-from superrec2.utils.trees import LowestCommonAncestor
+from superrec2.utils.trees import LowestCommonAncestor, nodes_by_name
 from superrec2.utils.dynamic_programming import RetentionPolicy
 from superrec2.model.tree_mapping import get_species_mapping
 from superrec2.compute.reconciliation import reconcile_lca
@@ -48,6 +48,7 @@ def _assert_results(
 
 def test_speciations():
     gene_tree = Tree("((x_1,y_1)2,z_1)1;", format=1)
+    gene_nodes = nodes_by_name(gene_tree)
     species_tree = Tree("((X,Y)XY,Z)XYZ;", format=1)
     species_lca = LowestCommonAncestor(species_tree)
     leaf_gene_species = get_species_mapping(gene_tree, species_tree)
@@ -59,9 +60,9 @@ def test_speciations():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("ab"),
-            gene_tree & "y_1": list("de"),
-            gene_tree & "z_1": list("abcde"),
+            gene_nodes["x_1"]: list("ab"),
+            gene_nodes["y_1"]: list("de"),
+            gene_nodes["z_1"]: list("abcde"),
         },
     )
 
@@ -75,8 +76,8 @@ def test_speciations():
                 object_species=reconcile_lca(input_1).object_species,
                 syntenies={
                     **input_1.leaf_syntenies,
-                    gene_tree & "2": list("abcde"),
-                    gene_tree & "1": list("abcde"),
+                    gene_nodes["2"]: list("abcde"),
+                    gene_nodes["1"]: list("abcde"),
                 },
                 ordered=True,
             ),
@@ -90,9 +91,9 @@ def test_speciations():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("abd"),
-            gene_tree & "y_1": list("bde"),
-            gene_tree & "z_1": list("abcde"),
+            gene_nodes["x_1"]: list("abd"),
+            gene_nodes["y_1"]: list("bde"),
+            gene_nodes["z_1"]: list("abcde"),
         },
     )
 
@@ -106,8 +107,8 @@ def test_speciations():
                 object_species=reconcile_lca(input_2).object_species,
                 syntenies={
                     **input_2.leaf_syntenies,
-                    gene_tree & "2": list("abde"),
-                    gene_tree & "1": list("abcde"),
+                    gene_nodes["2"]: list("abde"),
+                    gene_nodes["1"]: list("abcde"),
                 },
                 ordered=True,
             ),
@@ -121,9 +122,9 @@ def test_speciations():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("ab"),
-            gene_tree & "y_1": list("cd"),
-            gene_tree & "z_1": list("be"),
+            gene_nodes["x_1"]: list("ab"),
+            gene_nodes["y_1"]: list("cd"),
+            gene_nodes["z_1"]: list("be"),
         },
     )
 
@@ -137,8 +138,8 @@ def test_speciations():
                 object_species=reconcile_lca(input_3).object_species,
                 syntenies={
                     **input_3.leaf_syntenies,
-                    gene_tree & "2": list("cdab"),
-                    gene_tree & "1": list("cdabe"),
+                    gene_nodes["2"]: list("cdab"),
+                    gene_nodes["1"]: list("cdabe"),
                 },
                 ordered=True,
             ),
@@ -147,8 +148,8 @@ def test_speciations():
                 object_species=reconcile_lca(input_3).object_species,
                 syntenies={
                     **input_3.leaf_syntenies,
-                    gene_tree & "2": list("cdabe"),
-                    gene_tree & "1": list("cdabe"),
+                    gene_nodes["2"]: list("cdabe"),
+                    gene_nodes["1"]: list("cdabe"),
                 },
                 ordered=True,
             ),
@@ -157,8 +158,8 @@ def test_speciations():
                 object_species=reconcile_lca(input_3).object_species,
                 syntenies={
                     **input_3.leaf_syntenies,
-                    gene_tree & "2": list("abecd"),
-                    gene_tree & "1": list("abecd"),
+                    gene_nodes["2"]: list("abecd"),
+                    gene_nodes["1"]: list("abecd"),
                 },
                 ordered=True,
             ),
@@ -172,9 +173,9 @@ def test_speciations():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("ab"),
-            gene_tree & "y_1": list("cd"),
-            gene_tree & "z_1": list("ba"),
+            gene_nodes["x_1"]: list("ab"),
+            gene_nodes["y_1"]: list("cd"),
+            gene_nodes["z_1"]: list("ba"),
         },
     )
 
@@ -192,9 +193,9 @@ def test_speciations():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("a"),
-            gene_tree & "y_1": list("a"),
-            gene_tree & "z_1": list("b"),
+            gene_nodes["x_1"]: list("a"),
+            gene_nodes["y_1"]: list("a"),
+            gene_nodes["z_1"]: list("b"),
         },
     )
 
@@ -208,8 +209,8 @@ def test_speciations():
                 object_species=reconcile_lca(input_5).object_species,
                 syntenies={
                     **input_5.leaf_syntenies,
-                    gene_tree & "2": list("a"),
-                    gene_tree & "1": list("ab"),
+                    gene_nodes["2"]: list("a"),
+                    gene_nodes["1"]: list("ab"),
                 },
                 ordered=True,
             ),
@@ -218,8 +219,8 @@ def test_speciations():
                 object_species=reconcile_lca(input_5).object_species,
                 syntenies={
                     **input_5.leaf_syntenies,
-                    gene_tree & "2": list("a"),
-                    gene_tree & "1": list("ba"),
+                    gene_nodes["2"]: list("a"),
+                    gene_nodes["1"]: list("ba"),
                 },
                 ordered=True,
             ),
@@ -229,6 +230,7 @@ def test_speciations():
 
 def test_duplications():
     gene_tree = Tree("((x_1,x_2)2,y_1)1;", format=1)
+    gene_nodes = nodes_by_name(gene_tree)
     species_tree = Tree("(X,Y)XY;", format=1)
     species_lca = LowestCommonAncestor(species_tree)
     leaf_gene_species = get_species_mapping(gene_tree, species_tree)
@@ -240,9 +242,9 @@ def test_duplications():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("ab"),
-            gene_tree & "x_2": list("de"),
-            gene_tree & "y_1": list("abcde"),
+            gene_nodes["x_1"]: list("ab"),
+            gene_nodes["x_2"]: list("de"),
+            gene_nodes["y_1"]: list("abcde"),
         },
     )
 
@@ -256,8 +258,8 @@ def test_duplications():
                 object_species=reconcile_lca(input_1).object_species,
                 syntenies={
                     **input_1.leaf_syntenies,
-                    gene_tree & "2": list("abcde"),
-                    gene_tree & "1": list("abcde"),
+                    gene_nodes["2"]: list("abcde"),
+                    gene_nodes["1"]: list("abcde"),
                 },
                 ordered=True,
             ),
@@ -271,9 +273,9 @@ def test_duplications():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("abd"),
-            gene_tree & "x_2": list("bde"),
-            gene_tree & "y_1": list("abcde"),
+            gene_nodes["x_1"]: list("abd"),
+            gene_nodes["x_2"]: list("bde"),
+            gene_nodes["y_1"]: list("abcde"),
         },
     )
 
@@ -287,8 +289,8 @@ def test_duplications():
                 object_species=reconcile_lca(input_2).object_species,
                 syntenies={
                     **input_2.leaf_syntenies,
-                    gene_tree & "2": list("abde"),
-                    gene_tree & "1": list("abcde"),
+                    gene_nodes["2"]: list("abde"),
+                    gene_nodes["1"]: list("abcde"),
                 },
                 ordered=True,
             ),
@@ -302,9 +304,9 @@ def test_duplications():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("de"),
-            gene_tree & "x_2": list("ab"),
-            gene_tree & "y_1": list("abcde"),
+            gene_nodes["x_1"]: list("de"),
+            gene_nodes["x_2"]: list("ab"),
+            gene_nodes["y_1"]: list("abcde"),
         },
     )
 
@@ -318,8 +320,8 @@ def test_duplications():
                 object_species=reconcile_lca(input_3).object_species,
                 syntenies={
                     **input_3.leaf_syntenies,
-                    gene_tree & "2": list("abcde"),
-                    gene_tree & "1": list("abcde"),
+                    gene_nodes["2"]: list("abcde"),
+                    gene_nodes["1"]: list("abcde"),
                 },
                 ordered=True,
             ),
@@ -333,9 +335,9 @@ def test_duplications():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("bde"),
-            gene_tree & "x_2": list("abd"),
-            gene_tree & "y_1": list("abcde"),
+            gene_nodes["x_1"]: list("bde"),
+            gene_nodes["x_2"]: list("abd"),
+            gene_nodes["y_1"]: list("abcde"),
         },
     )
 
@@ -349,8 +351,8 @@ def test_duplications():
                 object_species=reconcile_lca(input_4).object_species,
                 syntenies={
                     **input_4.leaf_syntenies,
-                    gene_tree & "2": list("abde"),
-                    gene_tree & "1": list("abcde"),
+                    gene_nodes["2"]: list("abde"),
+                    gene_nodes["1"]: list("abcde"),
                 },
                 ordered=True,
             ),
@@ -364,9 +366,9 @@ def test_duplications():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("ab"),
-            gene_tree & "x_2": list("cd"),
-            gene_tree & "y_1": list("be"),
+            gene_nodes["x_1"]: list("ab"),
+            gene_nodes["x_2"]: list("cd"),
+            gene_nodes["y_1"]: list("be"),
         },
     )
 
@@ -380,8 +382,8 @@ def test_duplications():
                 object_species=reconcile_lca(input_5).object_species,
                 syntenies={
                     **input_5.leaf_syntenies,
-                    gene_tree & "2": list("cdabe"),
-                    gene_tree & "1": list("cdabe"),
+                    gene_nodes["2"]: list("cdabe"),
+                    gene_nodes["1"]: list("cdabe"),
                 },
                 ordered=True,
             ),
@@ -395,9 +397,9 @@ def test_duplications():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("ab"),
-            gene_tree & "x_2": list("cd"),
-            gene_tree & "y_1": list("ba"),
+            gene_nodes["x_1"]: list("ab"),
+            gene_nodes["x_2"]: list("cd"),
+            gene_nodes["y_1"]: list("ba"),
         },
     )
 
@@ -411,7 +413,9 @@ def test_duplications():
 
 def test_transfers():
     gene_tree = Tree("((x_1,y_1)1,(x_2,y_2)2)3;", format=1)
+    gene_nodes = nodes_by_name(gene_tree)
     species_tree = Tree("(X,Y)XY;", format=1)
+    species_nodes = nodes_by_name(species_tree)
     species_lca = LowestCommonAncestor(species_tree)
     leaf_gene_species = get_species_mapping(gene_tree, species_tree)
 
@@ -421,10 +425,10 @@ def test_transfers():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("a"),
-            gene_tree & "x_2": list("a"),
-            gene_tree & "y_1": list("b"),
-            gene_tree & "y_2": list("b"),
+            gene_nodes["x_1"]: list("a"),
+            gene_nodes["x_2"]: list("a"),
+            gene_nodes["y_1"]: list("b"),
+            gene_nodes["y_2"]: list("b"),
         },
     )
 
@@ -437,15 +441,15 @@ def test_transfers():
                 input_1,
                 object_species={
                     **leaf_gene_species,
-                    gene_tree & "1": species_tree & "X",
-                    gene_tree & "2": species_tree & "Y",
-                    gene_tree & "3": species_tree & "XY",
+                    gene_nodes["1"]: species_nodes["X"],
+                    gene_nodes["2"]: species_nodes["Y"],
+                    gene_nodes["3"]: species_nodes["XY"],
                 },
                 syntenies={
                     **input_1.leaf_syntenies,
-                    gene_tree & "1": list("ab"),
-                    gene_tree & "2": list("ab"),
-                    gene_tree & "3": list("ab"),
+                    gene_nodes["1"]: list("ab"),
+                    gene_nodes["2"]: list("ab"),
+                    gene_nodes["3"]: list("ab"),
                 },
                 ordered=True,
             ),
@@ -453,15 +457,15 @@ def test_transfers():
                 input_1,
                 object_species={
                     **leaf_gene_species,
-                    gene_tree & "1": species_tree & "X",
-                    gene_tree & "2": species_tree & "Y",
-                    gene_tree & "3": species_tree & "XY",
+                    gene_nodes["1"]: species_nodes["X"],
+                    gene_nodes["2"]: species_nodes["Y"],
+                    gene_nodes["3"]: species_nodes["XY"],
                 },
                 syntenies={
                     **input_1.leaf_syntenies,
-                    gene_tree & "1": list("ba"),
-                    gene_tree & "2": list("ba"),
-                    gene_tree & "3": list("ba"),
+                    gene_nodes["1"]: list("ba"),
+                    gene_nodes["2"]: list("ba"),
+                    gene_nodes["3"]: list("ba"),
                 },
                 ordered=True,
             ),
@@ -469,15 +473,15 @@ def test_transfers():
                 input_1,
                 object_species={
                     **leaf_gene_species,
-                    gene_tree & "1": species_tree & "Y",
-                    gene_tree & "2": species_tree & "X",
-                    gene_tree & "3": species_tree & "XY",
+                    gene_nodes["1"]: species_nodes["Y"],
+                    gene_nodes["2"]: species_nodes["X"],
+                    gene_nodes["3"]: species_nodes["XY"],
                 },
                 syntenies={
                     **input_1.leaf_syntenies,
-                    gene_tree & "1": list("ab"),
-                    gene_tree & "2": list("ab"),
-                    gene_tree & "3": list("ab"),
+                    gene_nodes["1"]: list("ab"),
+                    gene_nodes["2"]: list("ab"),
+                    gene_nodes["3"]: list("ab"),
                 },
                 ordered=True,
             ),
@@ -485,15 +489,15 @@ def test_transfers():
                 input_1,
                 object_species={
                     **leaf_gene_species,
-                    gene_tree & "1": species_tree & "Y",
-                    gene_tree & "2": species_tree & "X",
-                    gene_tree & "3": species_tree & "XY",
+                    gene_nodes["1"]: species_nodes["Y"],
+                    gene_nodes["2"]: species_nodes["X"],
+                    gene_nodes["3"]: species_nodes["XY"],
                 },
                 syntenies={
                     **input_1.leaf_syntenies,
-                    gene_tree & "1": list("ba"),
-                    gene_tree & "2": list("ba"),
-                    gene_tree & "3": list("ba"),
+                    gene_nodes["1"]: list("ba"),
+                    gene_nodes["2"]: list("ba"),
+                    gene_nodes["3"]: list("ba"),
                 },
                 ordered=True,
             ),
@@ -4,7 +4,7 @@ from superrec2.model.reconciliation import (
     SuperReconciliationOutput,
     get_default_cost,
 )
-from superrec2.utils.trees import LowestCommonAncestor
+from superrec2.utils.trees import LowestCommonAncestor, nodes_by_name
 from superrec2.utils.dynamic_programming import RetentionPolicy
 from superrec2.model.tree_mapping import get_species_mapping
 from superrec2.compute.reconciliation import reconcile_lca
@@ -49,13 +49,14 @@ def _assert_results(
 
 def test_gain_lca_sets():
     gene_tree = Tree("((((a,b)1,c)2,d)3,(e,f)4)5;", format=1)
+    gene_nodes = nodes_by_name(gene_tree)
     leaf_syntenies = {
-        gene_tree & "a": "ab",
-        gene_tree & "b": "ac",
-        gene_tree & "c": "ad",
-        gene_tree & "d": "bd",
-        gene_tree & "e": "cde",
-        gene_tree & "f": "ef",
+        gene_nodes["a"]: "ab",
+        gene_nodes["b"]: "ac",
+        gene_nodes["c"]: "ad",
+        gene_nodes["d"]: "bd",
+        gene_nodes["e"]: "cde",
+        gene_nodes["f"]: "ef",
     }
     s_input = SuperReconciliationInput(
         gene_tree,
@@ -67,37 +68,38 @@ def test_gain_lca_sets():
 
     gain_sets = _compute_gain_sets(s_input)
     assert gain_sets == {
-        gene_tree & "a": set(),
-        gene_tree & "b": set(),
-        gene_tree & "c": set(),
-        gene_tree & "d": set(),
-        gene_tree & "e": set(),
-        gene_tree & "f": set("f"),
-        gene_tree & "1": set(),
-        gene_tree & "2": set("a"),
-        gene_tree & "3": set("b"),
-        gene_tree & "4": set("e"),
-        gene_tree & "5": set("cd"),
+        gene_nodes["a"]: set(),
+        gene_nodes["b"]: set(),
+        gene_nodes["c"]: set(),
+        gene_nodes["d"]: set(),
+        gene_nodes["e"]: set(),
+        gene_nodes["f"]: set("f"),
+        gene_nodes["1"]: set(),
+        gene_nodes["2"]: set("a"),
+        gene_nodes["3"]: set("b"),
+        gene_nodes["4"]: set("e"),
+        gene_nodes["5"]: set("cd"),
     }
 
     lca_sets = _compute_lca_sets(s_input, gain_sets)
     assert lca_sets == {
-        gene_tree & "a": set("ab"),
-        gene_tree & "b": set("ac"),
-        gene_tree & "c": set("ad"),
-        gene_tree & "d": set("bd"),
-        gene_tree & "e": set("cde"),
-        gene_tree & "f": set("ef"),
-        gene_tree & "1": set("abc"),
-        gene_tree & "2": set("abcd"),
-        gene_tree & "3": set("bcd"),
-        gene_tree & "4": set("cde"),
-        gene_tree & "5": set("cd"),
+        gene_nodes["a"]: set("ab"),
+        gene_nodes["b"]: set("ac"),
+        gene_nodes["c"]: set("ad"),
+        gene_nodes["d"]: set("bd"),
+        gene_nodes["e"]: set("cde"),
+        gene_nodes["f"]: set("ef"),
+        gene_nodes["1"]: set("abc"),
+        gene_nodes["2"]: set("abcd"),
+        gene_nodes["3"]: set("bcd"),
+        gene_nodes["4"]: set("cde"),
+        gene_nodes["5"]: set("cd"),
     }
 
 
 def test_speciations():
     gene_tree = Tree("((x_1,y_1)2,z_1)1;", format=1)
+    gene_nodes = nodes_by_name(gene_tree)
     species_tree = Tree("((X,Y)XY,Z)XYZ;", format=1)
     species_lca = LowestCommonAncestor(species_tree)
     leaf_gene_species = get_species_mapping(gene_tree, species_tree)
@@ -109,9 +111,9 @@ def test_speciations():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("a"),
-            gene_tree & "y_1": list("a"),
-            gene_tree & "z_1": list("ab"),
+            gene_nodes["x_1"]: list("a"),
+            gene_nodes["y_1"]: list("a"),
+            gene_nodes["z_1"]: list("ab"),
         },
     )
 
@@ -125,8 +127,8 @@ def test_speciations():
                 object_species=reconcile_lca(input_1).object_species,
                 syntenies={
                     **input_1.leaf_syntenies,
-                    gene_tree & "2": list("a"),
-                    gene_tree & "1": list("a"),
+                    gene_nodes["2"]: list("a"),
+                    gene_nodes["1"]: list("a"),
                 },
                 ordered=False,
             ),
@@ -140,9 +142,9 @@ def test_speciations():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("ab"),
-            gene_tree & "y_1": list("ac"),
-            gene_tree & "z_1": list("bcd"),
+            gene_nodes["x_1"]: list("ab"),
+            gene_nodes["y_1"]: list("ac"),
+            gene_nodes["z_1"]: list("bcd"),
         },
     )
 
@@ -156,8 +158,8 @@ def test_speciations():
                 object_species=reconcile_lca(input_2).object_species,
                 syntenies={
                     **input_2.leaf_syntenies,
-                    gene_tree & "2": list("abc"),
-                    gene_tree & "1": list("bc"),
+                    gene_nodes["2"]: list("abc"),
+                    gene_nodes["1"]: list("bc"),
                 },
                 ordered=False,
             ),
@@ -166,6 +168,7 @@ def test_speciations():
 
     # Test 3: Gains and losses with inheritance
     gene_tree = Tree("((((x_1,y_1)1,z_1)2,t_1)3,(w_1,v_1)4)5;", format=1)
+    gene_nodes = nodes_by_name(gene_tree)
     species_tree = Tree("((((X,Y)XY,Z)XYZ,T)XYZT,(W,V)WV)XYZTVW;", format=1)
     species_lca = LowestCommonAncestor(species_tree)
     leaf_gene_species = get_species_mapping(gene_tree, species_tree)
@@ -176,12 +179,12 @@ def test_speciations():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("abx"),
-            gene_tree & "y_1": list("acx"),
-            gene_tree & "z_1": list("ad"),
-            gene_tree & "t_1": list("bd"),
-            gene_tree & "w_1": list("cde"),
-            gene_tree & "v_1": list("ef"),
+            gene_nodes["x_1"]: list("abx"),
+            gene_nodes["y_1"]: list("acx"),
+            gene_nodes["z_1"]: list("ad"),
+            gene_nodes["t_1"]: list("bd"),
+            gene_nodes["w_1"]: list("cde"),
+            gene_nodes["v_1"]: list("ef"),
         },
     )
 
@@ -195,11 +198,11 @@ def test_speciations():
                 object_species=reconcile_lca(input_3).object_species,
                 syntenies={
                     **input_3.leaf_syntenies,
-                    gene_tree & "1": list("abcdx"),
-                    gene_tree & "2": list("abcd"),
-                    gene_tree & "3": list("bcd"),
-                    gene_tree & "4": list("cde"),
-                    gene_tree & "5": list("cd"),
+                    gene_nodes["1"]: list("abcdx"),
+                    gene_nodes["2"]: list("abcd"),
+                    gene_nodes["3"]: list("bcd"),
+                    gene_nodes["4"]: list("cde"),
+                    gene_nodes["5"]: list("cd"),
                 },
                 ordered=False,
             ),
@@ -209,6 +212,7 @@ def test_speciations():
 
 def test_duplications():
     gene_tree = Tree("(((x_1,x_2)3,y_1)2,z_1)1;", format=1)
+    gene_nodes = nodes_by_name(gene_tree)
     species_tree = Tree("((X,Y)XY,Z);", format=1)
     species_lca = LowestCommonAncestor(species_tree)
     leaf_gene_species = get_species_mapping(gene_tree, species_tree)
@@ -220,10 +224,10 @@ def test_duplications():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("a"),
-            gene_tree & "x_2": list("a"),
-            gene_tree & "y_1": list("ab"),
-            gene_tree & "z_1": list("ab"),
+            gene_nodes["x_1"]: list("a"),
+            gene_nodes["x_2"]: list("a"),
+            gene_nodes["y_1"]: list("ab"),
+            gene_nodes["z_1"]: list("ab"),
         },
     )
 
@@ -237,9 +241,9 @@ def test_duplications():
                 object_species=reconcile_lca(input_1).object_species,
                 syntenies={
                     **input_1.leaf_syntenies,
-                    gene_tree & "3": list("a"),
-                    gene_tree & "2": list("ab"),
-                    gene_tree & "1": list("ab"),
+                    gene_nodes["3"]: list("a"),
+                    gene_nodes["2"]: list("ab"),
+                    gene_nodes["1"]: list("ab"),
                 },
                 ordered=False,
             ),
@@ -248,9 +252,9 @@ def test_duplications():
                 object_species=reconcile_lca(input_1).object_species,
                 syntenies={
                     **input_1.leaf_syntenies,
-                    gene_tree & "3": list("ab"),
-                    gene_tree & "2": list("ab"),
-                    gene_tree & "1": list("ab"),
+                    gene_nodes["3"]: list("ab"),
+                    gene_nodes["2"]: list("ab"),
+                    gene_nodes["1"]: list("ab"),
                 },
                 ordered=False,
             ),
@@ -264,10 +268,10 @@ def test_duplications():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("ab"),
-            gene_tree & "x_2": list("ac"),
-            gene_tree & "y_1": list("bcd"),
-            gene_tree & "z_1": list("abcd"),
+            gene_nodes["x_1"]: list("ab"),
+            gene_nodes["x_2"]: list("ac"),
+            gene_nodes["y_1"]: list("bcd"),
+            gene_nodes["z_1"]: list("abcd"),
         },
     )
 
@@ -281,9 +285,9 @@ def test_duplications():
                 object_species=reconcile_lca(input_2).object_species,
                 syntenies={
                     **input_2.leaf_syntenies,
-                    gene_tree & "3": list("abcd"),
-                    gene_tree & "2": list("abcd"),
-                    gene_tree & "1": list("abcd"),
+                    gene_nodes["3"]: list("abcd"),
+                    gene_nodes["2"]: list("abcd"),
+                    gene_nodes["1"]: list("abcd"),
                 },
                 ordered=False,
             ),
@@ -293,7 +297,9 @@ def test_duplications():
 
 def test_transfers():
     gene_tree = Tree("((x_1,y_1)1,(x_2,y_2)2)3;", format=1)
+    gene_nodes = nodes_by_name(gene_tree)
     species_tree = Tree("(X,Y)XY;", format=1)
+    species_nodes = nodes_by_name(species_tree)
     species_lca = LowestCommonAncestor(species_tree)
     leaf_gene_species = get_species_mapping(gene_tree, species_tree)
 
@@ -304,10 +310,10 @@ def test_transfers():
         leaf_gene_species,
         get_default_cost(),
         leaf_syntenies={
-            gene_tree & "x_1": list("abc"),
-            gene_tree & "y_1": list("ab"),
-            gene_tree & "x_2": list("bc"),
-            gene_tree & "y_2": list("abc"),
+            gene_nodes["x_1"]: list("abc"),
+            gene_nodes["y_1"]: list("ab"),
+            gene_nodes["x_2"]: list("bc"),
+            gene_nodes["y_2"]: list("abc"),
         },
     )
 
@@ -321,9 +327,9 @@ def test_transfers():
                 object_species=reconcile_lca(input_1).object_species,
                 syntenies={
                     **input_1.leaf_syntenies,
-                    gene_tree & "1": list("abc"),
-                    gene_tree & "2": list("abc"),
-                    gene_tree & "3": list("abc"),
+                    gene_nodes["1"]: list("abc"),
+                    gene_nodes["2"]: list("abc"),
+                    gene_nodes["3"]: list("abc"),
                 },
                 ordered=False,
             ),
@@ -339,15 +345,15 @@ def test_transfers():
                 input_1,
                 object_species={
                     **leaf_gene_species,
-                    gene_tree & "1": species_tree & "X",
-                    gene_tree & "2": species_tree & "Y",
-                    gene_tree & "3": species_tree & "XY",
+                    gene_nodes["1"]: species_nodes["X"],
+                    gene_nodes["2"]: species_nodes["Y"],
+                    gene_nodes["3"]: species_nodes["XY"],
                 },
                 syntenies={
                     **input_1.leaf_syntenies,
-                    gene_tree & "1": list("abc"),
-                    gene_tree & "2": list("abc"),
-                    gene_tree & "3": list("abc"),
+                    gene_nodes["1"]: list("abc"),
+                    gene_nodes["2"]: list("abc"),
+                    gene_nodes["3"]: list("abc"),
                 },
                 ordered=False,
             ),
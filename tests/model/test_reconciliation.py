@@ -1,5 +1,6 @@
+from dataclasses import replace
 from ete3 import Tree
-from superrec2.utils.trees import LowestCommonAncestor
+from superrec2.utils.trees import LowestCommonAncestor, nodes_by_name
 from superrec2.model.reconciliation import (
     ReconciliationInput,
     SuperReconciliationInput,
@@ -26,76 +27,82 @@ gene_tree = Tree(
 species_tree = Tree("(((X,Y)XY,Z)XYZ,(W,T)WT)XYZWT;", format=1)
 species_lca = LowestCommonAncestor(species_tree)
 
+gene_nodes = nodes_by_name(gene_tree)
+species_nodes = nodes_by_name(species_tree)
+
 leaf_object_species = {
-    gene_tree & "x_1": species_tree & "X",
-    gene_tree & "x_2": species_tree & "X",
-    gene_tree & "x_3": species_tree & "X",
-    gene_tree & "y_1": species_tree & "Y",
-    gene_tree & "y_2": species_tree & "Y",
-    gene_tree & "y_3": species_tree & "Y",
-    gene_tree & "y_4": species_tree & "Y",
-    gene_tree & "z_1": species_tree & "Z",
-    gene_tree & "z_2": species_tree & "Z",
-    gene_tree & "z_3": species_tree & "Z",
-    gene_tree & "w_1": species_tree & "W",
-    gene_tree & "w_2": species_tree & "W",
-    gene_tree & "w_3": species_tree & "W",
-    gene_tree & "t_1": species_tree & "T",
-    gene_tree & "t_2": species_tree & "T",
+    gene_nodes[gene]: species_nodes[species]
+    for gene, species in (
+        ("x_1", "X"),
+        ("x_2", "X"),
+        ("x_3", "X"),
+        ("y_1", "Y"),
+        ("y_2", "Y"),
+        ("y_3", "Y"),
+        ("y_4", "Y"),
+        ("z_1", "Z"),
+        ("z_2", "Z"),
+        ("z_3", "Z"),
+        ("w_1", "W"),
+        ("w_2", "W"),
+        ("w_3", "W"),
+        ("t_1", "T"),
+        ("t_2", "T"),
+    )
 }
 
 object_species = {
     **leaf_object_species,
-    gene_tree & "1": species_tree & "XYZWT",
-    gene_tree & "2": species_tree & "XYZ",
-    gene_tree & "3": species_tree & "XYZ",
-    gene_tree & "4": species_tree & "W",
-    gene_tree & "5": species_tree & "XYZWT",
-    gene_tree & "6": species_tree & "XYZ",
-    gene_tree & "7": species_tree & "XY",
-    gene_tree & "8": species_tree & "XYZ",
-    gene_tree & "9": species_tree & "XY",
-    gene_tree & "10": species_tree & "Y",
-    gene_tree & "11": species_tree & "Y",
-    gene_tree & "12": species_tree & "WT",
-    gene_tree & "13": species_tree & "T",
-    gene_tree & "14": species_tree & "T",
+    gene_nodes["1"]: species_nodes["XYZWT"],
+    gene_nodes["2"]: species_nodes["XYZ"],
+    gene_nodes["3"]: species_nodes["XYZ"],
+    gene_nodes["4"]: species_nodes["W"],
+    gene_nodes["5"]: species_nodes["XYZWT"],
+    gene_nodes["6"]: species_nodes["XYZ"],
+    gene_nodes["7"]: species_nodes["XY"],
+    gene_nodes["8"]: species_nodes["XYZ"],
+    gene_nodes["9"]: species_nodes["XY"],
+    gene_nodes["10"]: species_nodes["Y"],
+    gene_nodes["11"]: species_nodes["Y"],
+    gene_nodes["12"]: species_nodes["WT"],
+    gene_nodes["13"]: species_nodes["T"],
+    gene_nodes["14"]: species_nodes["T"],
 }
 
 leaf_syntenies = {
-    gene_tree & "x_1": "abcd",
-    gene_tree & "z_1": "abcd",
-    gene_tree & "w_1": "ab",
-    gene_tree & "w_2": "abc",
-    gene_tree & "x_2": "defg",
-    gene_tree & "y_4": "def",
-    gene_tree & "x_3": "cdef",
-    gene_tree & "y_1": "ce",
-    gene_tree & "y_2": "cde",
-    gene_tree & "y_3": "cde",
-    gene_tree & "z_2": "cef",
-    gene_tree & "w_3": "defg",
-    gene_tree & "z_3": "defg",
-    gene_tree & "t_1": "def",
-    gene_tree & "t_2": "defg",
+    gene_nodes["x_1"]: "abcd",
+    gene_nodes["z_1"]: "abcd",
+    gene_nodes["w_1"]: "ab",
+    gene_nodes["w_2"]: "abc",
+    gene_nodes["x_2"]: "defg",
+    gene_nodes["y_4"]: "def",
+    gene_nodes["x_3"]: "cdef",
+    gene_nodes["y_1"]: "ce",
+    gene_nodes["y_2"]: "cde",
+    gene_nodes["y_3"]: "cde",
+    gene_nodes["z_2"]: "cef",
+    gene_nodes["w_3"]: "defg",
+    gene_nodes["z_3"]: "defg",
+    gene_nodes["t_1"]: "def",
+    gene_nodes["t_2"]: "defg",
 }
 
 syntenies = {
     **leaf_syntenies,
-    gene_tree & "1": "abcdefg",
-    gene_tree & "2": "abcd",
-    gene_tree & "3": "abcd",
-    gene_tree & "4": "abc",
-    gene_tree & "5": "abcdefg",
-    gene_tree & "6": "abcdefg",
-    gene_tree & "7": "defg",
-    gene_tree & "8": "cdef",
-    gene_tree & "9": "cdef",
-    gene_tree & "10": "cdef",
-    gene_tree & "11": "cde",
-    gene_tree & "12": "defg",
-    gene_tree & "13": "defg",
-    gene_tree & "14": "defg",
+    gene_nodes["1"]: "abcdefg",
+    gene_nodes["2"]: "abcd",
+    gene_nodes["3"]: "abcd",
+    gene_nodes["4"]: "abc",
+    gene_nodes["5"]: "abcdefg",
+    gene_nodes["6"]: "abcdefg",
+    gene_nodes["7"]: "defg",
+    gene_nodes["8"]: "cdef",
+    gene_nodes["9"]: "cdef",
+    gene_nodes["10"]: "cdef",
+    gene_nodes["11"]: "cde",
+    gene_nodes["12"]: "defg",
+    gene_nodes["13"]: "defg",
+    gene_nodes["14"]: "defg",
 }
 
 rec_input = ReconciliationInput(
@@ -144,7 +151,30 @@ def test_node_event():
     }
 
     for name, event in expected_events.items():
-        assert rec_output.node_event(gene_tree & name) == event
+        assert rec_output.node_event(gene_nodes[name]) == event
+
+    events = rec_output.node_events()
+    assert len(events) == len(list(gene_tree.traverse()))
+
+    for node, event in events.items():
+        assert rec_output.node_event(node) == event
+
+    for name, event in expected_events.items():
+        assert events[gene_nodes[name]] == event
+
+    invalid_output = replace(
+        rec_output,
+        object_species={
+            **object_species,
+            gene_nodes["2"]: species_nodes["X"],
+            gene_nodes["x_1"]: species_nodes["Y"],
+        },
+    )
+    assert invalid_output.node_event(gene_nodes["2"]) == NodeEvent.INVALID
+    assert invalid_output.node_event(gene_nodes["x_1"]) == NodeEvent.INVALID
+    assert invalid_output.node_events() == {
+        node: invalid_output.node_event(node) for node in gene_tree.traverse()
+    }
 
 
 def test_labeling_cost():
@@ -165,3 +195,58 @@ def test_reconciliation_cost():
         rec_input.costs[NodeEvent.HORIZONTAL_TRANSFER] = hgt
         rec_input.costs[EdgeEvent.FULL_LOSS] = loss
         assert rec_output.cost() == value
+
+
+def test_hash():
+    for value in (rec_input, srec_input, rec_output, srec_output, usrec_output):
+        copy = replace(value)
+        assert copy is not value
+        assert copy == value
+        assert hash(copy) == hash(value)
+
+    assert hash(srec_output) != hash(usrec_output)
+
+    # Hashes must stay consistent with equality when nodes get renamed
+    unlabeled_tree = Tree("((x_1,y_1),z_1);")
+    unlabeled = ReconciliationInput(
+        unlabeled_tree,
+        rec_input.species_lca,
+        {
+            leaf: species_nodes[leaf.name[0].upper()]
+            for leaf in unlabeled_tree.get_leaves()
+        },
+    )
+    unlabeled_species = {
+        **unlabeled.leaf_object_species,
+        unlabeled_tree: species_nodes["XYZ"],
+        unlabeled_tree.children[0]: species_nodes["XY"],
+    }
+    before = ReconciliationOutput(unlabeled, unlabeled_species)
+    hash(before)
+    unlabeled.label_internal()
+    after = ReconciliationOutput(unlabeled, dict(unlabeled_species))
+
+    assert before == after
+    assert hash(before) == hash(after)
+    assert after in {before}
+
+
+def test_repr():
+    for value in (rec_input, srec_input, rec_output, srec_output):
+        assert repr(value) == repr(replace(value))
+
+    unlabeled = ReconciliationInput(
+        Tree("((x_1,y_1),z_1);"),
+        rec_input.species_lca,
+        {},
+    )
+    unlabeled_output = ReconciliationOutput(unlabeled, {})
+    assert "O0" not in repr(unlabeled)
+    assert "O0" not in repr(unlabeled_output)
+    unlabeled.label_internal()
+    assert "O0" in repr(unlabeled)
+    assert "O0" in repr(unlabeled_output)
+
+    unlabeled.costs[NodeEvent.DUPLICATION] = 7
+    assert "'DUPLICATION': 7" in repr(unlabeled)
+    assert "'DUPLICATION': 7" in repr(unlabeled_output)
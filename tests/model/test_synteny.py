@@ -1,13 +1,18 @@
 from ete3 import Tree
+from ete3.coretype.tree import TreeError
+import pytest
+from superrec2.utils.trees import nodes_by_name
 from superrec2.model.synteny import (
     sort_synteny,
     format_synteny,
     parse_synteny_mapping,
     serialize_synteny_mapping,
+    freeze_synteny_mapping,
 )
 
 
 tree = Tree("((x_3,(y_1,(y_2,y_3)11)10)9,z_2)8;", format=1)
+nodes = nodes_by_name(tree)
 
 
 def test_sort_synteny():
@@ -45,16 +50,19 @@ def test_parse_synteny_mapping():
             "z_2": ["cas1", "a", "b", "c", "cas3"],
         },
     ) == {
-        tree & "x_3": "abcdef",
-        tree & "z_2": ["cas1", "a", "b", "c", "cas3"],
+        nodes["x_3"]: "abcdef",
+        nodes["z_2"]: ["cas1", "a", "b", "c", "cas3"],
     }
 
+    with pytest.raises(TreeError):
+        parse_synteny_mapping(tree, {"w_1": "abc"})
+
 
 def test_serialize_synteny_mapping():
     assert serialize_synteny_mapping(
         {
-            tree & "x_3": ["a", "b", "c", "d", "e", "f"],
-            tree & "z_2": ["cas1", "a", "b", "c", "cas3"],
+            nodes["x_3"]: ["a", "b", "c", "d", "e", "f"],
+            nodes["z_2"]: ["cas1", "a", "b", "c", "cas3"],
         }
     ) == {
         "x_3": ["a", "b", "c", "d", "e", "f"],
@@ -62,10 +70,22 @@ def test_serialize_synteny_mapping():
     }
     assert serialize_synteny_mapping(
         {
-            tree & "x_3": ["a", "b", "c", "d", "e", "f"],
-            tree & "z_2": {"cas1", "a", "b", "cas10", "cas2"},
+            nodes["x_3"]: ["a", "b", "c", "d", "e", "f"],
+            nodes["z_2"]: {"cas1", "a", "b", "cas10", "cas2"},
         }
     ) == {
         "x_3": ["a", "b", "c", "d", "e", "f"],
         "z_2": ["a", "b", "cas1", "cas2", "cas10"],
     }
+
+
+def test_freeze_synteny_mapping():
+    assert freeze_synteny_mapping(
+        {
+            nodes["z_2"]: {"cas1", "a", "b", "cas10", "cas2"},
+            nodes["x_3"]: ["a", "b", "c", "d", "e", "f"],
+        }
+    ) == (
+        ("x_3", ("a", "b", "c", "d", "e", "f")),
+        ("z_2", ("a", "b", "cas1", "cas2", "cas10")),
+    )
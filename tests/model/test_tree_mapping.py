@@ -1,8 +1,12 @@
 from ete3 import Tree
+from ete3.coretype.tree import TreeError
+import pytest
+from superrec2.utils.trees import nodes_by_name
 from superrec2.model.tree_mapping import (
     parse_tree_mapping,
     get_species_mapping,
     serialize_tree_mapping,
+    freeze_tree_mapping,
 )
 
 
@@ -18,7 +22,9 @@ gene_tree = Tree(
 """,
     format=1,
 )
+gene_nodes = nodes_by_name(gene_tree)
 species_tree = Tree("(((X,Y)XY,Z)XYZ,(W,T)WT)XYZWT;", format=1)
+species_nodes = nodes_by_name(species_tree)
 
 
 def test_parse_tree_mapping():
@@ -42,50 +48,66 @@ def test_parse_tree_mapping():
             "14": "T",
         },
     ) == {
-        gene_tree & "1": species_tree & "XYZWT",
-        gene_tree & "2": species_tree & "XYZ",
-        gene_tree & "3": species_tree & "XYZ",
-        gene_tree & "4": species_tree & "W",
-        gene_tree & "5": species_tree & "XYZWT",
-        gene_tree & "6": species_tree & "XYZ",
-        gene_tree & "7": species_tree & "XY",
-        gene_tree & "8": species_tree & "XYZ",
-        gene_tree & "9": species_tree & "XY",
-        gene_tree & "10": species_tree & "Y",
-        gene_tree & "11": species_tree & "Y",
-        gene_tree & "12": species_tree & "WT",
-        gene_tree & "13": species_tree & "T",
-        gene_tree & "14": species_tree & "T",
+        gene_nodes["1"]: species_nodes["XYZWT"],
+        gene_nodes["2"]: species_nodes["XYZ"],
+        gene_nodes["3"]: species_nodes["XYZ"],
+        gene_nodes["4"]: species_nodes["W"],
+        gene_nodes["5"]: species_nodes["XYZWT"],
+        gene_nodes["6"]: species_nodes["XYZ"],
+        gene_nodes["7"]: species_nodes["XY"],
+        gene_nodes["8"]: species_nodes["XYZ"],
+        gene_nodes["9"]: species_nodes["XY"],
+        gene_nodes["10"]: species_nodes["Y"],
+        gene_nodes["11"]: species_nodes["Y"],
+        gene_nodes["12"]: species_nodes["WT"],
+        gene_nodes["13"]: species_nodes["T"],
+        gene_nodes["14"]: species_nodes["T"],
     }
 
+    with pytest.raises(TreeError):
+        parse_tree_mapping(gene_tree, species_tree, {"15": "XYZWT"})
+
+    with pytest.raises(TreeError):
+        parse_tree_mapping(gene_tree, species_tree, {"1": "V"})
+
 
 def test_get_species_mapping():
     assert get_species_mapping(gene_tree, species_tree) == {
-        gene_tree & "x_1": species_tree & "X",
-        gene_tree & "x_2": species_tree & "X",
-        gene_tree & "x_3": species_tree & "X",
-        gene_tree & "y_1": species_tree & "Y",
-        gene_tree & "y_2": species_tree & "Y",
-        gene_tree & "y_3": species_tree & "Y",
-        gene_tree & "y_4": species_tree & "Y",
-        gene_tree & "z_1": species_tree & "Z",
-        gene_tree & "z_2": species_tree & "Z",
-        gene_tree & "z_3": species_tree & "Z",
-        gene_tree & "w_1": species_tree & "W",
-        gene_tree & "w_2": species_tree & "W",
-        gene_tree & "w_3": species_tree & "W",
-        gene_tree & "t_1": species_tree & "T",
-        gene_tree & "t_2": species_tree & "T",
+        gene_nodes["x_1"]: species_nodes["X"],
+        gene_nodes["x_2"]: species_nodes["X"],
+        gene_nodes["x_3"]: species_nodes["X"],
+        gene_nodes["y_1"]: species_nodes["Y"],
+        gene_nodes["y_2"]: species_nodes["Y"],
+        gene_nodes["y_3"]: species_nodes["Y"],
+        gene_nodes["y_4"]: species_nodes["Y"],
+        gene_nodes["z_1"]: species_nodes["Z"],
+        gene_nodes["z_2"]: species_nodes["Z"],
+        gene_nodes["z_3"]: species_nodes["Z"],
+        gene_nodes["w_1"]: species_nodes["W"],
+        gene_nodes["w_2"]: species_nodes["W"],
+        gene_nodes["w_3"]: species_nodes["W"],
+        gene_nodes["t_1"]: species_nodes["T"],
+        gene_nodes["t_2"]: species_nodes["T"],
+    }
+
+    prefixed_tree = Tree("(x_y_1,X_Y_Z_2,x_3,y_4,xy);", format=1)
+    prefixed_nodes = nodes_by_name(prefixed_tree)
+    prefixed_species = Tree("(X,X_Y)XXY;", format=1)
+    prefixed_species_nodes = nodes_by_name(prefixed_species)
+    assert get_species_mapping(prefixed_tree, prefixed_species) == {
+        prefixed_nodes["x_y_1"]: prefixed_species_nodes["X"],
+        prefixed_nodes["X_Y_Z_2"]: prefixed_species_nodes["X"],
+        prefixed_nodes["x_3"]: prefixed_species_nodes["X"],
     }
 
 
 def test_serialize_tree_mapping():
     assert serialize_tree_mapping(
         {
-            gene_tree & "x_1": species_tree & "X",
-            gene_tree & "2": species_tree & "XYZ",
-            gene_tree & "x_2": species_tree & "X",
-            gene_tree & "3": species_tree & "XYZ",
+            gene_nodes["x_1"]: species_nodes["X"],
+            gene_nodes["2"]: species_nodes["XYZ"],
+            gene_nodes["x_2"]: species_nodes["X"],
+            gene_nodes["3"]: species_nodes["XYZ"],
         }
     ) == {
         "2": "XYZ",
@@ -93,3 +115,14 @@ def test_serialize_tree_mapping():
         "x_1": "X",
         "x_2": "X",
     }
+
+
+def test_freeze_tree_mapping():
+    assert freeze_tree_mapping(
+        {
+            gene_nodes["x_1"]: species_nodes["X"],
+            gene_nodes["2"]: species_nodes["XYZ"],
+            gene_nodes["x_2"]: species_nodes["X"],
+            gene_nodes["3"]: species_nodes["XYZ"],
+        }
+    ) == (("2", "XYZ"), ("3", "XYZ"), ("x_1", "X"), ("x_2", "X"))
@@ -0,0 +1,167 @@
+from ete3 import Tree
+from superrec2.model.reconciliation import (
+    NodeEvent,
+    EdgeEvent,
+    SuperReconciliationInput,
+    SuperReconciliationOutput,
+)
+from superrec2.render import layout
+from superrec2.utils.tex import MeasureBox
+from superrec2.utils.trees import LowestCommonAncestor, nodes_by_name
+
+
+def _measure_nodes(nodes, params, jobs=1):
+    # Give each label a distinct size without going through TeX
+    return [MeasureBox(len(name) + 1, len(name) + 2, 1) for _, name in nodes]
+
+
+def _make_recs(gene_newick, species_newick, object_species, all_syntenies):
+    # Build outputs that share the same input and object tree,
+    # but label it with different syntenies
+    gene_tree = Tree(gene_newick, format=1)
+    species_tree = Tree(species_newick, format=1)
+    gene_nodes = nodes_by_name(gene_tree)
+    species_nodes = nodes_by_name(species_tree)
+
+    srec_input = SuperReconciliationInput(
+        object_tree=gene_tree,
+        species_lca=LowestCommonAncestor(species_tree),
+        leaf_object_species={
+            gene_nodes[gene]: species_nodes[species]
+            for gene, species in object_species.items()
+            if gene_nodes[gene].is_leaf()
+        },
+        costs={
+            NodeEvent.SPECIATION: 0,
+            NodeEvent.DUPLICATION: 1,
+            NodeEvent.HORIZONTAL_TRANSFER: 1,
+            EdgeEvent.FULL_LOSS: 1,
+            EdgeEvent.SEGMENTAL_LOSS: 1,
+        },
+    )
+    mapping = {
+        gene_nodes[gene]: species_nodes[species]
+        for gene, species in object_species.items()
+    }
+    return [
+        SuperReconciliationOutput(
+            srec_input,
+            mapping,
+            {gene_nodes[gene]: synteny for gene, synteny in syntenies.items()},
+            ordered=True,
+        )
+        for syntenies in all_syntenies
+    ]
+
+
+def _layout_shape(rec, rec_layout):
+    # Describe a layout without the gene keys, since pseudo-genes created
+    # for losses are only equal to themselves
+    return [
+        (
+            subtree.rect,
+            subtree.trunk,
+            subtree.fork_thickness,
+            list(subtree.anchors.values()),
+            [
+                (
+                    branch.kind,
+                    branch.rect,
+                    branch.anchor_parent,
+                    branch.anchor_left,
+                    branch.anchor_right,
+                    branch.anchor_child,
+                    branch.name,
+                    branch.anchor_foreign,
+                )
+                for branch in subtree.branches.values()
+            ],
+        )
+        for subtree in map(rec_layout.__getitem__, rec.input.species_lca.preorder)
+    ]
+
+
+def test_compute_many(monkeypatch):
+    monkeypatch.setattr(layout, "measure_nodes", _measure_nodes)
+
+    recs = _make_recs(
+        "((x_1,y_1)2,(x_2,y_2)3)1;",
+        "(X,Y)XY;",
+        {
+            "1": "XY",
+            "2": "XY",
+            "3": "XY",
+            "x_1": "X",
+            "x_2": "X",
+            "y_1": "Y",
+            "y_2": "Y",
+        },
+        (
+            {
+                "1": "abc",
+                "2": "ab",
+                "3": "bc",
+                "x_1": "a",
+                "y_1": "b",
+                "x_2": "b",
+                "y_2": "c",
+            },
+            {
+                "1": "abcdefgh",
+                "2": "abcdefg",
+                "3": "bcdefgh",
+                "x_1": "abcdef",
+                "y_1": "abcde",
+                "x_2": "bcdefg",
+                "y_2": "h",
+            },
+        ),
+    )
+
+    layouts = layout.compute_many(recs)
+    assert len(layouts) == len(recs)
+
+    for rec, rec_layout in zip(recs, layouts):
+        assert rec_layout == layout.compute(rec)
+
+    assert layouts[0] != layouts[1]
+
+
+def test_compute_many_losses(monkeypatch):
+    monkeypatch.setattr(layout, "measure_nodes", _measure_nodes)
+
+    # Node 1 is a duplication in XYZ; x_1 loses its copies in Z and Y on
+    # the way down to X, and y_1 loses its copy in X on the way to Y
+    recs = _make_recs(
+        "((y_1,z_1)2,x_1)1;",
+        "((X,Y)XY,Z)XYZ;",
+        {
+            "1": "XYZ",
+            "2": "XYZ",
+            "x_1": "X",
+            "y_1": "Y",
+            "z_1": "Z",
+        },
+        (
+            {"1": "abc", "2": "ab", "x_1": "c", "y_1": "a", "z_1": "b"},
+            {
+                "1": "abcdef",
+                "2": "abcde",
+                "x_1": "f",
+                "y_1": "abcd",
+                "z_1": "e",
+            },
+        ),
+    )
+
+    layouts = layout.compute_many(recs)
+    assert len(layouts) == len(recs)
+
+    for rec, rec_layout in zip(recs, layouts):
+        shape = _layout_shape(rec, rec_layout)
+        assert shape == _layout_shape(rec, layout.compute(rec))
+        assert any(
+            kind == EdgeEvent.FULL_LOSS for subtree in shape for kind, *_ in subtree[4]
+        )
+
+    assert _layout_shape(recs[0], layouts[0]) != _layout_shape(recs[1], layouts[1])
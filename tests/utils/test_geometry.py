@@ -0,0 +1,47 @@
+from superrec2.utils.geometry import Position, Rect
+
+
+def test_position_format():
+    assert f"{Position(1, 2)}" == "1,2"
+    assert f"{Position(1.5, 2)}" == "1.5,2"
+    assert f"{Position(1.23456, 2.5) : 4}" == "1.2346,2.5"
+
+    # Integer and float coordinates are formatted differently even
+    # though they compare equal
+    assert f"{Position(14, 3) : 4}" == "14,3"
+    assert f"{Position(14.0, 3) : 4}" == "14.0,3"
+    assert f"{Position(14, 3) : 4}" == "14,3"
+
+    # Signed zeros are preserved
+    assert f"{Position(0.0, 1.5) : 4}" == "0.0,1.5"
+    assert f"{Position(-0.0, 1.5) : 4}" == "-0.0,1.5"
+    assert f"{Position(1.5, -0.0) : 4}" == "1.5,-0.0"
+
+
+def test_position_arithmetic():
+    pos = Position(1, 2) + (3, 4)
+    assert isinstance(pos, Position)
+    assert pos == Position(4, 6)
+    assert (pos.x, pos.y) == (4, 6)
+
+    pos = Position(1, 2) - Position(3, 4)
+    assert isinstance(pos, Position)
+    assert pos == Position(-2, -2)
+
+
+def test_rect_positions():
+    rect = Rect(1, 2, 4, 6) + (1, 1)
+    assert isinstance(rect, Rect)
+    assert rect == Rect(2, 3, 4, 6)
+    assert rect - (1, 1) == Rect(1, 2, 4, 6)
+
+    assert isinstance(rect.center(), Position)
+    assert rect.top_left() == Position(2, 3)
+    assert rect.top() == Position(4, 3)
+    assert rect.top_right() == Position(6, 3)
+    assert rect.right() == Position(6, 6)
+    assert rect.bottom_right() == Position(6, 9)
+    assert rect.bottom() == Position(4, 9)
+    assert rect.bottom_left() == Position(2, 9)
+    assert rect.left() == Position(2, 6)
+    assert rect.center() == Position(4, 6)
@@ -38,6 +38,28 @@ def test_valid():
                 assert rmq(i, j) is None
 
 
+class _Keyed:
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+def test_ties():
+    data = [_Keyed(key) for key in (2, 1, 3, 1, 1, 4, 2, 1, 0, 2)]
+    rmq = RangeMinQuery(data)
+
+    for i in range(len(data)):
+        for j in range(i + 1, len(data) + 1):
+            assert rmq(i, j) is min(data[i:j])
+
+
+def test_empty():
+    rmq = RangeMinQuery([])
+    assert rmq(0, 0) is None
+
+
 def test_change_source():
     data = [8, 8, 8]
     rmq = RangeMinQuery(data)
@@ -43,6 +43,10 @@ def test_subseq_segment_dist():
     assert dist(0b111, 0b110, True) == -1
     assert dist(0b111, 0b110, False) == -1
 
+    assert dist(0b1000_0001, 0b1101_0101, True) == 1
+    assert dist(0b1000_0001, 0b1101_0101, False) == 1
+    assert dist(0b0000_0001, 0b1101_0101, False) == 0
+
     mask_all = (1 << 64) - 1
     mask_s1 = mask_all & ~(1 << 52) & ~(1 << 53)
 
@@ -13,3 +13,8 @@ def test_measure():
         MeasureBox(29.7385, 6.94444, 1.94444),
         MeasureBox(55.57887, 6.94444, 1.94444),
     ]
+
+
+def test_measure_jobs():
+    texts = ["abcdef", r"\(abcdef\)", r"\(a_1b_2c_3d_4e_5f_5\)", "", "xyz"]
+    assert measure(texts, jobs=2) == measure(texts)
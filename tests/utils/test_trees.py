@@ -10,6 +10,7 @@ from superrec2.utils.trees import (
     supertree,
     all_supertrees,
     is_binary,
+    nodes_by_name,
     graft,
     arrange_leaves,
     binarize,
@@ -143,12 +144,39 @@ def test_ancestor_relation():
             )
 
 
+def test_lca_deep_tree():
+    # Caterpillar tree deeper than the interpreter recursion limit
+    tree = Tree()
+    spine = [tree]
+
+    for _ in range(5000):
+        spine[-1].add_child()
+        spine.append(spine[-1].add_child())
+
+    lca = LowestCommonAncestor(tree)
+    deepest = spine[-1]
+    side = spine[100].children[0]
+
+    assert lca(deepest, side) == spine[100]
+    assert lca.is_ancestor_of(tree, deepest)
+    assert lca.is_ancestor_of(spine[2500], deepest)
+    assert not lca.is_ancestor_of(deepest, spine[2500])
+    assert not lca.is_ancestor_of(side, deepest)
+
+
+def test_preorder():
+    tree = Tree("((2,(4,5)3)1,(7,8,(10)9)6)0;", format=8)
+    lca = LowestCommonAncestor(tree)
+    assert lca.preorder == tuple(tree.traverse("preorder"))
+
+
 def test_level():
     tree = Tree("((2,(4,5)3)1,(7,8,(10)9)6)0;", format=8)
     lca = LowestCommonAncestor(tree)
 
     for node in tree.traverse():
         assert lca.level(node) == _level_naive(node)
+        assert lca.levels[node] == _level_naive(node)
 
 
 def test_distance():
@@ -289,6 +317,16 @@ def _assert_tree_results(expect, actual):
     )
 
 
+def test_nodes_by_name():
+    tree = Tree("((a,(b,c)d)e,(a,f)g)h;", format=1)
+    nodes = nodes_by_name(tree)
+
+    assert set(nodes) == {"a", "b", "c", "d", "e", "f", "g", "h"}
+
+    for name, node in nodes.items():
+        assert node is tree & name
+
+
 def test_graft():
     _assert_tree_results(
         graft(Tree("A;"), Tree("X;")),